@@ -0,0 +1,152 @@
+import argparse
+import multiprocessing
+import os
+import time
+from datetime import datetime, timedelta
+
+
+def init_worker(threads):
+    # Setiap proses chunk mendapat bagian core sendiri, sama seperti proses kamera
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    import cv2
+
+    cv2.setNumThreads(threads)
+
+
+def analyze_chunk(task):
+    import cv2
+    from backends import load_detector
+    from config import load_config
+    from pipeline import CameraPipeline
+
+    config = load_config(task["config_path"])
+    config["threads_per_process"] = task["threads"]
+    camera = next(camera for camera in config["cameras"] if camera["id"] == task["camera"])
+    with open("coco.txt", "r") as my_file:
+        class_list = my_file.read().split("\n")
+
+    detector = load_detector(config)
+    pipeline = CameraPipeline(
+        camera["id"], camera["areas"], class_list, None,
+        camera["gating"], camera["roi"], camera["tracker"], config["captures"], camera["detection"], None, camera["smoothing"], None, camera["frame"],
+    )
+    # Mulai beberapa frame lebih awal supaya tracker sudah stabil saat chunk dimulai
+    first = max(0, task["start"] - task["warmup"] * task["stride"])
+    first -= first % task["stride"]
+    cap = cv2.VideoCapture(task["video"])
+    cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+
+    frames, states = [], []
+    for index in range(first, task["end"]):
+        if index % task["stride"]:
+            if not cap.grab():
+                break
+            continue
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame = pipeline.prepare(frame)
+        pipeline.fit(frame)
+        detections = pipeline.merge(detector.predict(pipeline.crops(frame), **pipeline.profile))
+        _, slot_states = pipeline.update(detections)
+        if index >= task["start"]:
+            frames.append(index)
+            states.append(slot_states)
+    cap.release()
+    return frames, states, pipeline.slot_names
+
+
+def split_chunks(frame_count, chunks, stride):
+    size = -(-frame_count // chunks)
+    size += -size % stride
+    return [(start, min(start + size, frame_count)) for start in range(0, frame_count, size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analisis offline okupansi dan pelanggaran slot dari rekaman video")
+    parser.add_argument("video")
+    parser.add_argument("output", help="file hasil, .csv atau .parquet")
+    parser.add_argument("--camera", help="id kamera di cameras.json yang layout slotnya dipakai (default: kamera pertama)")
+    parser.add_argument("--config", default=None, help="file konfigurasi (default: cameras.json)")
+    parser.add_argument("--stride", type=int, default=5, help="analisis satu frame setiap N frame")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 2))
+    parser.add_argument("--chunks", type=int, help="jumlah potongan video (default: sama dengan --workers)")
+    parser.add_argument("--warmup", type=int, default=10, help="frame sampel sebelum tiap chunk untuk memanaskan tracker")
+    parser.add_argument("--start-time", help="waktu mulai rekaman (ISO 8601) untuk kolom timestamp")
+    args = parser.parse_args()
+
+    import cv2
+    import pandas as pd
+    from config import CONFIG_PATH, load_config
+    from smoothing import SLOT_STATES
+
+    if not args.output.endswith((".csv", ".parquet")):
+        parser.error("output harus berakhiran .csv atau .parquet")
+    config_path = args.config or CONFIG_PATH
+    config = load_config(config_path)
+    camera = next((camera for camera in config["cameras"] if camera["id"] == args.camera), None) if args.camera else config["cameras"][0]
+    if camera is None:
+        parser.error(f"Unknown camera: {args.camera}")
+    start_time = datetime.fromisoformat(args.start_time) if args.start_time else None
+
+    cap = cv2.VideoCapture(args.video)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25
+    cap.release()
+    if frame_count <= 0:
+        parser.error(f"Tidak bisa membaca jumlah frame dari {args.video}")
+
+    threads = max(1, (os.cpu_count() or 1) // args.workers)
+    tasks = [
+        {
+            "config_path": config_path,
+            "camera": camera["id"],
+            "video": args.video,
+            "start": start,
+            "end": end,
+            "stride": args.stride,
+            "warmup": args.warmup,
+            "threads": threads,
+        }
+        for start, end in split_chunks(frame_count, args.chunks or args.workers, args.stride)
+    ]
+
+    started = time.perf_counter()
+    rows = {"frame": [], "states": []}
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(args.workers, initializer=init_worker, initargs=(threads,)) as pool:
+        # imap menjaga urutan chunk, jadi hasilnya tinggal disambung
+        for number, (frames, states, names) in enumerate(pool.imap(analyze_chunk, tasks), start=1):
+            rows["frame"].extend(frames)
+            rows["states"].extend(states)
+            print(f"Chunk {number}/{len(tasks)} selesai ({len(frames)} frame)")
+
+    if not rows["frame"]:
+        parser.error("Tidak ada frame yang berhasil dianalisis")
+    wide = pd.DataFrame(rows["states"], columns=names)
+    wide.insert(0, "frame", rows["frame"])
+    data = wide.melt(id_vars="frame", var_name="slot", value_name="state_code")
+    data = data.sort_values(["frame", "slot"], key=lambda column: column.map(names.index) if column.name == "slot" else column, ignore_index=True)
+    data.insert(0, "camera", camera["id"])
+    data.insert(2, "seconds", data["frame"] / fps)
+    if start_time is not None:
+        data.insert(3, "timestamp", [start_time + timedelta(seconds=seconds) for seconds in data["seconds"]])
+    data["state"] = pd.Categorical.from_codes(data.pop("state_code"), SLOT_STATES)
+    data["occupied"] = data["state"] != "empty"
+    data["violation"] = data["state"] == "violation"
+
+    if args.output.endswith(".parquet"):
+        data.to_parquet(args.output, index=False)
+    else:
+        data.to_csv(args.output, index=False)
+
+    elapsed = time.perf_counter() - started
+    analyzed = len(rows["frame"])
+    print(f"{analyzed} frame dianalisis dalam {elapsed:.1f} detik ({analyzed / elapsed:.1f} frame/detik), hasil: {args.output}")
+    summary = data.groupby("slot", sort=False, observed=True)[["occupied", "violation"]].mean()
+    for slot, row in summary.iterrows():
+        print(f"{slot}: terisi {row['occupied']:.0%}, melanggar {row['violation']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
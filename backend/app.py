@@ -1,220 +1,280 @@
-import cv2
-import pandas as pd
-import numpy as np
 import os
+import time
 from datetime import datetime, timedelta
-from ultralytics import YOLO
-from flask import Flask, Response, jsonify, send_from_directory
+from flask import Flask, Response, abort, jsonify, request, send_from_directory
 from flask_cors import CORS
+from config import load_config
+from layouts import LayoutStore
+from metrics import render_metrics
+from occupancy_store import RESOLUTIONS, OccupancyStore, dwell_summary, utilization
+from streaming import StatusDeltas, multipart_chunk, parse_stream_args, total_counts
+from violation_store import ViolationStore
+from worker import StatusHub, start_cameras
 
 app = Flask(__name__)
-CORS(app)
+# Header cursor halaman harus dibuka supaya bisa dibaca klien web lintas origin
+CORS(app, expose_headers=["X-Next-Cursor"])
 
-model = YOLO('yolov8s.pt')
+config = load_config()
+workers = {}
+groups = []
+status_hub = StatusHub()
 
-cap = cv2.VideoCapture('dataset_v2.mp4')
-
-empty_slots = 0
-occupied_slots = 0
-violation_slots = 0
-
-with open("coco.txt", "r") as my_file:
-    class_list = my_file.read().split("\n")
-
-areas = {
-    "area1": [(166, 186), (0, 349), (139, 325), (292, 161)],
-    "area2": [(292, 161), (139, 325), (301, 288), (429, 142)],
-    "area3": [(429, 142), (301, 288), (462, 257), (562, 122)],
-    "area4": [(562, 122), (462, 257), (609, 233), (673, 111)],
-    "area5": [(673, 111), (609, 233), (734, 214), (767, 106)],
-    "area6": [(767, 106), (734, 214), (832, 198), (845, 101)],
-    "area7": [(845, 101), (832, 198), (914, 185), (911, 102)],
-}
-
-previous_detections = {}
-violation_timers = {}
-
-capture_directory = os.path.join("images", "captures")
+capture_directory = config["capture_directory"]
 os.makedirs(capture_directory, exist_ok=True)
 
-def get_line_positions(area_coords, line_spacing=0.35):
-    coords = np.array(area_coords, np.float32)
-    width_top = coords[3][0] - coords[0][0]
-    width_bottom = coords[2][0] - coords[1][0]
-    positions = [line_spacing, 1 - line_spacing]
-    lines = []
-    
-    for ratio in positions:
-        top_x = coords[0][0] + ratio * width_top
-        bottom_x = coords[1][0] + ratio * width_bottom
-        lines.append((top_x, bottom_x))
-    
-    return lines
-
-def is_between_lines(point, area_coords, line_positions):
-    cx, cy = point
-    coords = np.array(area_coords, np.float32)
-    top_y = (coords[0][1] + coords[3][1]) / 2
-    bottom_y = (coords[1][1] + coords[2][1]) / 2
-    ratio = (cy - top_y) / (bottom_y - top_y)
-    left_line_x = line_positions[0][0] + ratio * (line_positions[0][1] - line_positions[0][0])
-    right_line_x = line_positions[1][0] + ratio * (line_positions[1][1] - line_positions[1][0])
-    return left_line_x <= cx <= right_line_x
-
-def draw_vertical_lines(frame, area_coords, line_spacing=0.3):
-    coords = np.array(area_coords, np.float32)
-    top_y = (coords[0][1] + coords[3][1]) / 2
-    bottom_y = (coords[1][1] + coords[2][1]) / 2
-    width_top = coords[3][0] - coords[0][0]
-    width_bottom = coords[2][0] - coords[1][0]
-    positions = [line_spacing, 1 - line_spacing]
-    
-    for ratio in positions:
-        top_x = coords[0][0] + ratio * width_top
-        bottom_x = coords[1][0] + ratio * width_bottom
-        start_point = (int(top_x), int(top_y))
-        end_point = (int(bottom_x), int(bottom_y))
-        cv2.line(frame, start_point, end_point, (0, 255, 255), 2)
-
-def generate_frames():
-    global empty_slots, occupied_slots, violation_slots
-    global previous_detections, violation_timers
-    
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        frame = cv2.resize(frame, (1020, 500))
-        results = model.predict(frame, verbose=False)
-        detections = pd.DataFrame(results[0].boxes.data).astype("float")
-        area_counts = {area_name: 0 for area_name in areas}
-        violations = {area_name: 0 for area_name in areas}
-        current_detections = {}
-
-        for index, row in detections.iterrows():
-            x1, y1, x2, y2 = int(row[0]), int(row[1]), int(row[2]), int(row[3])
-            class_id = int(row[5])
-            class_name = class_list[class_id]
-
-            if class_name in ["car"]:
-                cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
-                is_inside_area = False
-                is_violation = True
-
-                for area_name, area_coords in areas.items():
-                    if cv2.pointPolygonTest(np.array(area_coords, np.int32), (cx, cy), False) >= 0:
-                        area_counts[area_name] += 1
-                        is_inside_area = True
-
-                        line_positions = get_line_positions(area_coords, line_spacing=0.35)
-                        if is_between_lines((cx, cy), area_coords, line_positions):
-                            is_violation = False
-
-                        current_detections[index] = (x1, y1, x2, y2, is_violation, cx, cy)
-                        if is_violation:
-                            violations[area_name] += 1
-                        break
-
-                if not is_inside_area:
-                    current_detections[index] = (x1, y1, x2, y2, True, cx, cy)
-
-        for index, (x1, y1, x2, y2, is_violation, cx, cy) in current_detections.items():
-            if index in previous_detections:
-                prev_x1, prev_y1, prev_x2, prev_y2, prev_is_violation, prev_cx, prev_cy = previous_detections[index]
-                if abs(cx - prev_cx) < 10 and abs(cy - prev_cy) < 10:
-                    x1, y1, x2, y2 = prev_x1, prev_y1, prev_x2, prev_y2
-
-            box_color = (255, 255, 255) if not is_violation else (0, 0, 255)
-            cv2.rectangle(frame, (x1, y1), (x2, y2), box_color, 2)
-            cv2.circle(frame, (cx, cy), 3, box_color, -1)
-
-            if is_violation:
-                if index not in violation_timers:
-                    violation_timers[index] = datetime.now()
-                elif datetime.now() - violation_timers[index] >= timedelta(seconds=3):
-                    filename = os.path.join(capture_directory, f"pelanggaran_{index}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg")
-                    cv2.imwrite(filename, frame[y1:y2, x1:x2])
-                    print(f"Gambar pelanggaran disimpan: {filename}")
-            else:
-                violation_timers.pop(index, None)
-
-        previous_detections = current_detections
-
-        empty_slots = 0
-        occupied_slots = 0
-        violation_slots = 0
-
-        for area_name, area_coords in areas.items():
-            if violations[area_name] > 0:
-                violation_slots += 1
-            elif area_counts[area_name] > 0:
-                occupied_slots += 1
-            else:
-                empty_slots += 1
-
-        for area_index, (area_name, area_coords) in enumerate(areas.items(), start=1):
-            color = (0, 0, 255) if violations[area_name] > 0 else (255, 0, 0) if area_counts[area_name] > 0 else (0, 255, 0)
-            cv2.polylines(frame, [np.array(area_coords, np.int32)], True, color, 2)
-            draw_vertical_lines(frame, area_coords)
-            circle_center = (int(np.mean([coord[0] for coord in area_coords])), int(np.mean([coord[1] for coord in area_coords])) - 10)
-            cv2.circle(frame, circle_center, 15, (255, 255, 255), -1)
-            cv2.putText(frame, str(area_index), circle_center, cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 255), 1, cv2.LINE_AA)
-
-        ret, buffer = cv2.imencode('.jpg', frame)
-        frame = buffer.tobytes()
-
-        yield (b'--frame\r\n'
-            b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+store = ViolationStore(config["violation_db"])
+occupancy_store = OccupancyStore(config["occupancy_db"])
+layouts = LayoutStore(config["layout_directory"])
+
+def get_camera(camera_id):
+    for camera in config["cameras"]:
+        if camera["id"] == camera_id:
+            return camera
+    abort(404)
+
+def get_worker(camera_id):
+    if camera_id not in workers:
+        abort(404)
+    return workers[camera_id]
+
+def generate_frames(worker, tier, max_fps):
+    interval = 1 / max_fps
+    sequence = 0
+    with worker.subscribe(tier):
+        while True:
+            sequence, frame = worker.frame_buffer.wait_frame(sequence, tier)
+            if frame is None:
+                if not worker.is_alive():
+                    break
+                continue
+
+            started = time.monotonic()
+            yield multipart_chunk(frame)
+            time.sleep(max(0, interval - (time.monotonic() - started)))
+
+def video_feed_response(worker):
+    try:
+        tier, max_fps = parse_stream_args(request.args, config["stream"])
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    return Response(generate_frames(worker, tier, max_fps), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+def generate_status_events(camera_id=None):
+    version = 0
+    deltas = StatusDeltas(camera_id)
+    with status_hub.subscribe():
+        while True:
+            version, statuses = status_hub.wait(version)
+            if statuses is None:
+                yield ': keep-alive\n\n'
+                continue
+            event = deltas.event(statuses)
+            if event is not None:
+                yield event
+
+def status_stream_response(camera_id=None):
+    return Response(
+        generate_status_events(camera_id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
 
 @app.route('/status')
 def status():
-    global empty_slots, occupied_slots, violation_slots
-    return {
-        "empty_slots": empty_slots,
-        "occupied_slots": occupied_slots,
-        "violation_slots": violation_slots
-    }
+    cameras = {camera_id: worker.frame_buffer.status() for camera_id, worker in workers.items()}
+    return {**total_counts(cameras.values()), "cameras": cameras}
+
+@app.route('/status/stream')
+def status_stream():
+    return status_stream_response()
 
 @app.route('/video_feed')
 def video_feed():
-    return Response(generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
-
+    return video_feed_response(get_worker(config["cameras"][0]["id"]))
+
+@app.route('/cameras')
+def list_cameras():
+    cameras = []
+    for camera in config["cameras"]:
+        worker = workers.get(camera["id"])
+        cameras.append({
+            "id": camera["id"],
+            "slots": len(camera["areas"]),
+            "layout_version": camera["layout_version"],
+            "running": worker is not None and worker.is_alive(),
+            "viewers": worker.viewer_count() if worker is not None else 0,
+            "source": worker.frame_buffer.status().get("source") if worker is not None else None,
+        })
+    return jsonify(cameras)
+
+@app.route('/cameras/<string:camera_id>/status')
+def camera_status(camera_id):
+    return get_worker(camera_id).frame_buffer.status()
+
+@app.route('/cameras/<string:camera_id>/status/stream')
+def camera_status_stream(camera_id):
+    get_worker(camera_id)
+    return status_stream_response(camera_id)
+
+@app.route('/cameras/<string:camera_id>/video_feed')
+def camera_video_feed(camera_id):
+    return video_feed_response(get_worker(camera_id))
+
+@app.route('/cameras/<string:camera_id>/layout')
+def camera_layout(camera_id):
+    camera = get_camera(camera_id)
+    return jsonify({"camera": camera_id, "version": camera["layout_version"], "areas": camera["areas"]})
+
+@app.route('/cameras/<string:camera_id>/layout', methods=['PUT'])
+def replace_camera_layout(camera_id):
+    camera = get_camera(camera_id)
+    body = request.get_json(silent=True) or {}
+    if 'version' in body:
+        # Mengaktifkan kembali versi lama disimpan sebagai versi baru supaya riwayat tetap urut
+        previous = layouts.load(camera_id, body['version']) if isinstance(body['version'], int) else None
+        if previous is None:
+            return jsonify({"message": "Layout version not found"}), 404
+        areas = previous["areas"]
+    elif 'areas' in body:
+        areas = body['areas']
+    else:
+        return jsonify({"message": "Request body must contain areas or version"}), 400
 
+    try:
+        layout = layouts.save(camera_id, areas)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    camera["areas"] = layout["areas"]
+    camera["layout_version"] = layout["version"]
+    # Proses kamera mengganti geometri di antara dua frame, model tidak dimuat ulang
+    worker = workers.get(camera_id)
+    if worker is not None:
+        worker.set_layout(layout)
+    return jsonify(layout), 200
+
+@app.route('/cameras/<string:camera_id>/layouts')
+def list_camera_layouts(camera_id):
+    camera = get_camera(camera_id)
+    versions = []
+    for version in layouts.versions(camera_id):
+        layout = layouts.load(camera_id, version)
+        versions.append({"version": version, "created_at": layout["created_at"], "slots": len(layout["areas"])})
+    return jsonify({"camera": camera_id, "active_version": camera["layout_version"], "versions": versions})
+
+@app.route('/cameras/<string:camera_id>/layouts/<int:version>')
+def get_camera_layout_version(camera_id, version):
+    get_camera(camera_id)
+    layout = layouts.load(camera_id, version)
+    if layout is None:
+        return jsonify({"message": "Layout version not found"}), 404
+    return jsonify(layout)
+
+@app.route('/metrics')
+def metrics():
+    return Response(render_metrics(workers, status_hub), mimetype='text/plain; version=0.0.4')
 
 @app.route('/violations')
 def get_violations():
+    try:
+        limit = min(max(int(request.args.get('limit', 100)), 1), 500)
+        start = datetime.fromisoformat(request.args['from']) if 'from' in request.args else None
+        end = datetime.fromisoformat(request.args['to']) if 'to' in request.args else None
+        rows, next_cursor = store.query(
+            limit,
+            request.args.get('cursor'),
+            start,
+            end,
+            request.args.get('camera'),
+            request.args.get('slot'),
+        )
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
     violations = []
-    captures_dir = os.path.join("images", "captures")
-    
-    for filename in os.listdir(captures_dir):
-        if filename.startswith('pelanggaran_'):
-            parts = filename.replace('.jpg', '').split('_')
-            violation_id = parts[1]
-            timestamp = datetime.strptime('_'.join(parts[2:]), '%Y%m%d_%H%M%S')
-            
-            violations.append({
-                'image': filename,
-                'date': timestamp.strftime('%d %B %Y'),
-                'description': 'Kendaraan parkir di luar Area.',
-                'location': f'Area {violation_id}',
-            })
-    
-    violations.sort(key=lambda x: datetime.strptime(x['date'], '%d %B %Y'), reverse=True)
-    return jsonify(violations)
+    for row in rows:
+        violations.append({
+            'id': row['id'],
+            'image': row['image'],
+            'date': datetime.fromtimestamp(row['start_time']).strftime('%d %B %Y'),
+            'description': 'Kendaraan parkir di luar Area.',
+            'location': f"{row['camera']} / {row['slot'] or 'di luar area'}",
+            'camera': row['camera'],
+            'slot': row['slot'],
+            'track_id': row['track_id'],
+            'start_time': datetime.fromtimestamp(row['start_time']).isoformat(),
+            'end_time': datetime.fromtimestamp(row['end_time']).isoformat() if row['end_time'] else None,
+        })
+
+    response = jsonify(violations)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
 
 @app.route('/violations/<string:filename>', methods=['DELETE'])
 def delete_violation(filename):
     file_path = os.path.join(capture_directory, filename)
+    deleted = store.delete(filename)
     if os.path.exists(file_path):
         os.remove(file_path)
+        deleted = True
+    if deleted:
         return jsonify({"message": "Violation deleted successfully"}), 200
     else:
         return jsonify({"message": "Violation not found"}), 404
 
+@app.route('/occupancy/history')
+def occupancy_history():
+    try:
+        end = datetime.fromisoformat(request.args['to']) if 'to' in request.args else datetime.now()
+        start = datetime.fromisoformat(request.args['from']) if 'from' in request.args else end - timedelta(days=7)
+        resolution = request.args.get('resolution', 'hour')
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        if start >= end:
+            raise ValueError("from must be before to")
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    camera = request.args.get('camera')
+    slot = request.args.get('slot')
+    rows, slots = occupancy_store.rollups(start.timestamp(), end.timestamp(), resolution, camera, slot)
+    durations = occupancy_store.dwell_times(start.timestamp(), end.timestamp(), camera, slot)
+
+    series = []
+    hours = {}
+    for row in rows:
+        bucket_time = datetime.fromtimestamp(row['bucket'])
+        series.append({
+            'time': bucket_time.isoformat(),
+            'utilization': utilization(row),
+            'occupied_seconds': row['occupied_seconds'],
+            'violation_seconds': row['violation_seconds'],
+        })
+        # Rata-rata per jam dalam sehari, untuk melihat jam sibuk
+        totals = hours.setdefault(bucket_time.hour, {'empty_seconds': 0, 'occupied_seconds': 0, 'violation_seconds': 0})
+        for key in totals:
+            totals[key] += row[key]
+
+    totals = {key: sum(row[key] for row in slots) for key in ('empty_seconds', 'occupied_seconds', 'violation_seconds')}
+    peaks = sorted((point for point in series if point['utilization'] is not None), key=lambda point: point['utilization'], reverse=True)
+    return jsonify({
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'resolution': resolution,
+        'utilization': utilization(totals),
+        'violation_seconds': totals['violation_seconds'],
+        'slots': [{'camera': row['camera'], 'slot': row['slot'], 'utilization': utilization(row)} for row in slots],
+        'series': series,
+        'peak_times': peaks[:5],
+        'hourly_profile': [{'hour': hour, 'utilization': utilization(hours[hour])} for hour in sorted(hours)],
+        'dwell_times': dwell_summary(durations),
+    })
+
 @app.route('/violations', methods=['DELETE'])
 def delete_all_violations():
     try:
+        store.delete_all()
         for filename in os.listdir(capture_directory):
             if filename.startswith('pelanggaran_'):
                 file_path = os.path.join(capture_directory, filename)
@@ -225,7 +285,21 @@ def delete_all_violations():
     
 @app.route('/images/captures/<path:filename>')
 def serve_image(filename):
-    return send_from_directory(os.path.join('images', 'captures'), filename)
+    return send_from_directory(capture_directory, filename)
+
+def start_workers():
+    store.backfill(capture_directory, config["cameras"][0]["id"])
+    started_workers, started_groups = start_cameras(config, status_hub)
+    workers.update(started_workers)
+    groups.extend(started_groups)
+
+def stop_workers():
+    for group in groups:
+        group.stop()
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', debug=True, port=5000)
\ No newline at end of file
+    start_workers()
+    try:
+        app.run(host='0.0.0.0', debug=True, port=5000, use_reloader=False)
+    finally:
+        stop_workers()
\ No newline at end of file
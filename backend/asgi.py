@@ -0,0 +1,166 @@
+import asyncio
+import contextlib
+import json
+import re
+import time
+from urllib.parse import parse_qsl
+from a2wsgi import WSGIMiddleware
+import app as flask_app
+from streaming import StatusDeltas, multipart_chunk, parse_stream_args
+
+VIDEO_FEED = re.compile(r'^/(?:cameras/(?P<camera_id>[^/]+)/)?video_feed$')
+STATUS_STREAM = re.compile(r'^/(?:cameras/(?P<camera_id>[^/]+)/)?status/stream$')
+KEEP_ALIVE_SECONDS = 15
+
+
+class Notifier:
+    # Menjembatani notifikasi dari thread relay kamera ke event loop asyncio
+    def __init__(self, loop):
+        self.loop = loop
+        self.event = asyncio.Event()
+
+    def notify_threadsafe(self):
+        self.loop.call_soon_threadsafe(self._notify)
+
+    def _notify(self):
+        self.event.set()
+        self.event = asyncio.Event()
+
+
+class ParkVisionASGI:
+    def __init__(self, wsgi_app):
+        self.wsgi = WSGIMiddleware(wsgi_app)
+        self.frame_notifiers = {}
+        self.status_notifier = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] == "http" and scope["method"] == "GET":
+            match = VIDEO_FEED.match(scope["path"])
+            if match:
+                await self.video_feed(scope, receive, send, match["camera_id"])
+                return
+            match = STATUS_STREAM.match(scope["path"])
+            if match:
+                await self.status_stream(receive, send, match["camera_id"])
+                return
+        await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, flask_app.start_workers)
+                for camera_id, worker in flask_app.workers.items():
+                    notifier = Notifier(loop)
+                    worker.frame_buffer.add_listener(notifier.notify_threadsafe)
+                    self.frame_notifiers[camera_id] = notifier
+                self.status_notifier = Notifier(loop)
+                flask_app.status_hub.add_listener(self.status_notifier.notify_threadsafe)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                # Menghentikan proses kamera supaya sumber video dilepas dengan rapi
+                await asyncio.get_running_loop().run_in_executor(None, flask_app.stop_workers)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def video_feed(self, scope, receive, send, camera_id):
+        camera_id = camera_id or flask_app.config["cameras"][0]["id"]
+        worker = flask_app.workers.get(camera_id)
+        if worker is None:
+            await self.send_json(send, 404, {"message": "Camera not found"})
+            return
+        args = dict(parse_qsl(scope["query_string"].decode()))
+        try:
+            tier, max_fps = parse_stream_args(args, flask_app.config["stream"])
+        except ValueError as e:
+            await self.send_json(send, 400, {"message": str(e)})
+            return
+
+        async def frames():
+            notifier = self.frame_notifiers[camera_id]
+            interval = 1 / max_fps
+            sequence = 0
+            with worker.subscribe(tier):
+                while True:
+                    event = notifier.event
+                    sequence, frame = worker.frame_buffer.latest(sequence, tier)
+                    if frame is None:
+                        if worker.frame_buffer.closed:
+                            return
+                        await event.wait()
+                        continue
+                    started = time.monotonic()
+                    yield multipart_chunk(frame)
+                    await asyncio.sleep(max(0, interval - (time.monotonic() - started)))
+
+        await self.stream(receive, send, b'multipart/x-mixed-replace; boundary=frame', frames())
+
+    async def status_stream(self, receive, send, camera_id):
+        if camera_id is not None and camera_id not in flask_app.workers:
+            await self.send_json(send, 404, {"message": "Camera not found"})
+            return
+
+        async def events():
+            deltas = StatusDeltas(camera_id)
+            version = 0
+            with flask_app.status_hub.subscribe():
+                while True:
+                    event = self.status_notifier.event
+                    version, statuses = flask_app.status_hub.snapshot(version)
+                    if statuses is None:
+                        try:
+                            await asyncio.wait_for(event.wait(), KEEP_ALIVE_SECONDS)
+                        except asyncio.TimeoutError:
+                            yield b': keep-alive\n\n'
+                        continue
+                    message = deltas.event(statuses)
+                    if message is not None:
+                        yield message.encode()
+
+        await self.stream(receive, send, b'text/event-stream', events(), [(b'x-accel-buffering', b'no')])
+
+    async def stream(self, receive, send, content_type, chunks, headers=()):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b'content-type', content_type),
+                (b'cache-control', b'no-cache'),
+                (b'access-control-allow-origin', b'*'),
+                *headers,
+            ],
+        })
+
+        async def pump():
+            async with contextlib.aclosing(chunks):
+                async for chunk in chunks:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b'', "more_body": False})
+
+        async def wait_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        tasks = {asyncio.create_task(pump()), asyncio.create_task(wait_disconnect())}
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+
+    async def send_json(self, send, status, body):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b'content-type', b'application/json'), (b'access-control-allow-origin', b'*')],
+        })
+        await send({"type": "http.response.body", "body": json.dumps(body).encode()})
+
+
+app = ParkVisionASGI(flask_app.app)
@@ -0,0 +1,98 @@
+import cv2
+import numpy as np
+from postprocess import boxes_to_array
+
+
+class UltralyticsDetector:
+    def __init__(self, model_path):
+        # Diimpor di sini supaya backend lain tidak ikut memuat torch saat startup
+        from ultralytics import YOLO
+
+        self.model = YOLO(model_path)
+
+    def predict(self, frames, classes=None, imgsz=640, conf=0.25, iou=0.7):
+        results = self.model.predict(frames, classes=classes, imgsz=imgsz, conf=conf, iou=iou, verbose=False)
+        return [boxes_to_array(result) for result in results]
+
+
+def letterbox(frame, size):
+    height, width = frame.shape[:2]
+    scale = min(size / height, size / width)
+    resized_width, resized_height = round(width * scale), round(height * scale)
+    pad_x = (size - resized_width) // 2
+    pad_y = (size - resized_height) // 2
+    canvas = np.full((size, size, 3), 114, np.uint8)
+    canvas[pad_y:pad_y + resized_height, pad_x:pad_x + resized_width] = cv2.resize(
+        frame, (resized_width, resized_height), interpolation=cv2.INTER_LINEAR
+    )
+    return canvas, scale, pad_x, pad_y
+
+
+def decode_predictions(output, conf, iou, classes=None, max_det=300):
+    # Keluaran YOLOv8: (4 + jumlah kelas, jumlah anchor) dengan kotak cx, cy, w, h
+    predictions = output.T
+    class_scores = predictions[:, 4:]
+    class_ids = class_scores.argmax(1)
+    scores = class_scores[np.arange(len(predictions)), class_ids]
+    keep = scores >= conf
+    if classes is not None:
+        # Sama seperti argumen classes di ultralytics: kelas terbaik dipilih dari semua kelas dulu, baru disaring,
+        # jadi truk dengan skor mobil yang lebih rendah tidak ikut terhitung sebagai mobil
+        keep &= np.isin(class_ids, classes)
+    predictions, class_ids, scores = predictions[keep], class_ids[keep], scores[keep]
+    if not len(predictions):
+        return np.zeros((0, 6), np.float32)
+
+    centers, sizes = predictions[:, :2], predictions[:, 2:4]
+    boxes = np.column_stack([centers - sizes / 2, centers + sizes / 2])
+    tlwh = np.column_stack([boxes[:, :2], sizes]).tolist()
+    indices = cv2.dnn.NMSBoxesBatched(tlwh, scores.tolist(), class_ids.tolist(), conf, iou, top_k=max_det)
+    indices = np.asarray(indices, np.int32).reshape(-1)
+    return np.column_stack([boxes[indices], scores[indices], class_ids[indices]]).astype(np.float32)
+
+
+class OnnxDetector:
+    def __init__(self, model_path, providers=("CPUExecutionProvider",), threads=None):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=list(providers))
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, _ = model_input.shape
+        # Model hasil ekspor tanpa --dynamic punya ukuran input dan batch yang tetap
+        self.fixed_imgsz = height if isinstance(height, int) else None
+        self.max_batch = batch if isinstance(batch, int) else None
+
+    def predict(self, frames, classes=None, imgsz=640, conf=0.25, iou=0.7):
+        imgsz = self.fixed_imgsz or imgsz
+        step = self.max_batch or len(frames)
+        detections = []
+        for start in range(0, len(frames), step):
+            detections.extend(self._predict_batch(frames[start:start + step], classes, imgsz, conf, iou))
+        return detections
+
+    def _predict_batch(self, frames, classes, imgsz, conf, iou):
+        letterboxed = [letterbox(frame, imgsz) for frame in frames]
+        blob = cv2.dnn.blobFromImages([canvas for canvas, _, _, _ in letterboxed], 1 / 255, swapRB=True)
+        outputs = self.session.run(None, {self.input_name: blob})[0]
+
+        detections = []
+        for frame, output, (_, scale, pad_x, pad_y) in zip(frames, outputs, letterboxed):
+            data = decode_predictions(output, conf, iou, classes)
+            data[:, [0, 2]] = ((data[:, [0, 2]] - pad_x) / scale).clip(0, frame.shape[1])
+            data[:, [1, 3]] = ((data[:, [1, 3]] - pad_y) / scale).clip(0, frame.shape[0])
+            detections.append(data)
+        return detections
+
+
+def load_detector(config):
+    inference = config["inference"]
+    if inference["backend"] == "ultralytics":
+        return UltralyticsDetector(config["model"])
+    if inference["backend"] == "onnxruntime":
+        return OnnxDetector(config["model"], inference["providers"], config["threads_per_process"])
+    raise ValueError(f"Unknown inference backend: {inference['backend']}")
@@ -1,12 +1,14 @@
 import cv2
-import pandas as pd
 import numpy as np
 import os
 from datetime import datetime, timedelta
-from ultralytics import YOLO
+from backends import load_detector
+from config import load_config
+from postprocess import class_ids_for, count_areas, filter_boxes
+from slots import SlotLayout
 
-# Memuat model YOLOv8
-model = YOLO('yolov8s.pt')
+# Memuat detektor sesuai backend inferensi di cameras.json (ultralytics atau onnxruntime)
+detector = load_detector(load_config())
 
 # Fungsi untuk menangkap nilai RGB saat mouse bergerak
 def RGB(event, x, y, flags, param):
@@ -24,6 +26,7 @@ cap = cv2.VideoCapture('dataset_v2.mp4')
 # Memuat daftar kelas dari dataset COCO
 with open("coco.txt", "r") as my_file:
     class_list = my_file.read().split("\n")
+car_class_ids = class_ids_for(class_list, ["car"])
 
 # Mendefinisikan area parkir dengan koordinat masing-masing
 areas = {
@@ -36,6 +39,9 @@ areas = {
     "area7": [(845, 101), (832, 198), (914, 185), (911, 102)],
 }
 
+# Geometri area dihitung sekali di awal untuk pencarian area yang cepat
+layout = SlotLayout(areas)
+
 # Simpan status objek
 previous_detections = {}
 violation_timers = {}  # Menyimpan waktu pelanggaran setiap objek
@@ -44,40 +50,6 @@ capture_directory = "captures"  # Direktori untuk menyimpan gambar pelanggaran
 # Membuat direktori penyimpanan jika belum ada
 os.makedirs(capture_directory, exist_ok=True)
 
-# Fungsi untuk mendapatkan posisi garis vertikal berdasarkan area dan jarak antar garis
-def get_line_positions(area_coords, line_spacing=0.35):
-    coords = np.array(area_coords, np.float32)
-    width_top = coords[3][0] - coords[0][0]
-    width_bottom = coords[2][0] - coords[1][0]
-    
-    # Mendefinisikan posisi garis berdasarkan rasio
-    positions = [line_spacing, 1 - line_spacing]
-    lines = []
-    
-    for ratio in positions:
-        top_x = coords[0][0] + ratio * width_top
-        bottom_x = coords[1][0] + ratio * width_bottom
-        lines.append((top_x, bottom_x))
-    
-    return lines
-
-# Fungsi untuk memeriksa apakah objek berada di antara dua garis vertikal dalam suatu area
-def is_between_lines(point, area_coords, line_positions):
-    cx, cy = point  # Koordinat x dan y dari titik (objek)
-    coords = np.array(area_coords, np.float32)
-    
-    # Mendapatkan posisi tengah y di bagian atas dan bawah area
-    top_y = (coords[0][1] + coords[3][1]) / 2
-    bottom_y = (coords[1][1] + coords[2][1]) / 2
-    
-    # Menginterpolasi posisi x yang diizinkan berdasarkan posisi y
-    ratio = (cy - top_y) / (bottom_y - top_y)
-    left_line_x = line_positions[0][0] + ratio * (line_positions[0][1] - line_positions[0][0])
-    right_line_x = line_positions[1][0] + ratio * (line_positions[1][1] - line_positions[1][0])
-    
-    # Mengecek apakah titik berada di antara kedua garis
-    return left_line_x <= cx <= right_line_x
-
 # Fungsi untuk menggambar garis vertikal pada setiap area parkir
 def draw_vertical_lines(frame, area_coords, line_spacing=0.3):
     coords = np.array(area_coords, np.float32)
@@ -103,45 +75,19 @@ while True:
         break
 
     frame = cv2.resize(frame, (1020, 500))  # Ubah ukuran frame
-    results = model.predict(frame, verbose=False)  # Deteksi objek menggunakan model YOLO
-    detections = pd.DataFrame(results[0].boxes.data).astype("float")  # Konversi hasil deteksi ke DataFrame
-    area_counts = {area_name: 0 for area_name in areas}  # Menghitung objek di setiap area
-    violations = {area_name: 0 for area_name in areas}  # Menghitung pelanggaran di setiap area
+    detections = detector.predict([frame], classes=car_class_ids.tolist())[0]  # Deteksi mobil saja, hasilnya array NumPy (x1, y1, x2, y2, conf, kelas)
+
+    # Memfilter mobil dan menentukan area serta pelanggaran untuk semua deteksi sekaligus
+    indices, boxes, centroids = filter_boxes(detections, car_class_ids)
+    car_areas, is_violation = layout.locate(centroids)
+    area_counts, violation_counts = count_areas(car_areas, is_violation, len(areas))
+    area_counts = dict(zip(areas, area_counts.tolist()))  # Menghitung objek di setiap area
+    violations = dict(zip(areas, violation_counts.tolist()))  # Menghitung pelanggaran di setiap area
 
-    # Loop untuk setiap deteksi objek
+    # Menyimpan deteksi saat ini untuk pembaruan stabil
     current_detections = {}
-    for index, row in detections.iterrows():
-        x1, y1, x2, y2 = int(row[0]), int(row[1]), int(row[2]), int(row[3])
-        class_id = int(row[5])
-        class_name = class_list[class_id]
-
-        if class_name in ["car"]:
-            cx, cy = (x1 + x2) // 2, (y1 + y2) // 2  # Mendapatkan pusat objek
-            is_inside_area = False
-            is_violation = True  # Default objek dianggap melanggar jika di luar garis
-
-            # Memeriksa apakah objek berada di dalam area tertentu
-            for area_name, area_coords in areas.items():
-                if cv2.pointPolygonTest(np.array(area_coords, np.int32), (cx, cy), False) >= 0:
-                    area_counts[area_name] += 1
-                    is_inside_area = True
-
-                    # Memeriksa apakah objek berada di antara garis vertikal dalam area
-                    line_positions = get_line_positions(area_coords, line_spacing=0.35)
-                    if is_between_lines((cx, cy), area_coords, line_positions):
-                        is_violation = False  # Tidak dianggap melanggar jika berada di antara garis
-
-                    # Menyimpan deteksi saat ini untuk pembaruan stabil
-                    current_detections[index] = (x1, y1, x2, y2, is_violation, cx, cy)
-
-                    # Menambah jumlah pelanggaran jika terdapat pelanggaran di area tersebut
-                    if is_violation:
-                        violations[area_name] += 1
-                    break
-
-            # Jika objek di luar area parkir
-            if not is_inside_area:
-                current_detections[index] = (x1, y1, x2, y2, True, cx, cy)
+    for index, (x1, y1, x2, y2), (cx, cy), violation in zip(indices.tolist(), boxes.tolist(), centroids.tolist(), is_violation.tolist()):
+        current_detections[index] = (x1, y1, x2, y2, violation, cx, cy)
 
     # Mengupdate kotak deteksi berdasarkan status sebelumnya
     for index, (x1, y1, x2, y2, is_violation, cx, cy) in current_detections.items():
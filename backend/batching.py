@@ -0,0 +1,65 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class BatchScheduler:
+    def __init__(self, detector, max_batch_size=4, max_wait=0.02):
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, frame, profile=None):
+        future = Future()
+        self._requests.put((frame, profile or {}, future))
+        return future
+
+    def pending(self):
+        return self._requests.qsize()
+
+    def close(self):
+        self._requests.put(None)
+        self._thread.join()
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                self._requests.put(None)
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._requests.get()
+            if first is None:
+                break
+
+            # Kamera dengan profil deteksi berbeda tidak bisa digabung dalam satu panggilan model
+            groups = {}
+            for frame, profile, future in self._collect(first):
+                key = tuple(sorted(profile.items()))
+                groups.setdefault(key, (profile, []))[1].append((frame, future))
+            for profile, batch in groups.values():
+                self._predict(batch, profile)
+
+    def _predict(self, batch, profile):
+        try:
+            results = self.detector.predict([frame for frame, future in batch], **profile)
+        except Exception as e:
+            for frame, future in batch:
+                future.set_exception(e)
+            return
+        for (frame, future), result in zip(batch, results):
+            future.set_result(result)
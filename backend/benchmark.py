@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import cv2
+import numpy as np
+import psutil
+from backends import load_detector
+from captures import CaptureWriter
+from config import load_config
+from pipeline import CameraPipeline
+from streaming import encode_tiers
+from timing import StageTimer
+
+STAGES = ["decode", "resize", "inference", "postprocess", "slots", "draw", "encode"]
+
+
+def summarize(samples):
+    values = np.array(samples) * 1000
+    return {
+        "count": len(values),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p90_ms": float(np.percentile(values, 90)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark headless pipeline deteksi pada rekaman video")
+    parser.add_argument("--camera", help="id kamera di cameras.json (default: kamera pertama)")
+    parser.add_argument("--video", help="rekaman yang diputar ulang (default: sumber kamera)")
+    parser.add_argument("--frames", type=int, help="jumlah frame yang diukur (default: seluruh video)")
+    parser.add_argument("--warmup", type=int, default=10, help="frame awal yang tidak ikut diukur")
+    parser.add_argument("--tier", help="tingkat kualitas stream yang di-encode (default: default_tier)")
+    parser.add_argument("--json", help="simpan hasil ke file JSON untuk dibandingkan antar run")
+    args = parser.parse_args()
+
+    config = load_config()
+    camera = next((camera for camera in config["cameras"] if camera["id"] == args.camera), None) if args.camera else config["cameras"][0]
+    if camera is None:
+        parser.error(f"Unknown camera: {args.camera}")
+    tiers = config["stream"]["tiers"]
+    tier = args.tier or config["stream"]["default_tier"]
+    viewers = [1 if candidate["name"] == tier else 0 for candidate in tiers]
+    if not any(viewers):
+        parser.error(f"Unknown stream tier: {tier}")
+    with open("coco.txt", "r") as my_file:
+        class_list = my_file.read().split("\n")
+
+    process = psutil.Process()
+    detector = load_detector(config)
+    timer = StageTimer()
+    video = args.video or camera["source"]
+    cap = cv2.VideoCapture(video)
+
+    with tempfile.TemporaryDirectory() as capture_directory:
+        # Gambar pelanggaran tetap ditulis (biayanya ikut terukur) tapi ke direktori sementara
+        capture_writer = CaptureWriter(capture_directory)
+        pipeline = CameraPipeline(
+            camera["id"], camera["areas"], class_list, capture_writer,
+            camera["gating"], camera["roi"], camera["tracker"], config["captures"], camera["detection"], timer, camera["smoothing"], None, camera["frame"],
+        )
+        frame_times = []
+        peak_rss = process.memory_info().rss
+        started_at = None
+        index = 0
+        while args.frames is None or index < args.warmup + args.frames:
+            if index == args.warmup:
+                timer.samples.clear()
+                frame_times.clear()
+                started_at = time.perf_counter()
+            frame_started = time.perf_counter()
+            timer.start()
+            ret, frame = cap.read()
+            if not ret:
+                break
+            timer.lap("decode")
+            frame = pipeline.prepare(frame)
+            timer.lap("resize")
+            pipeline.fit(frame)
+            detections = None
+            if pipeline.gate.should_detect(frame):
+                results = detector.predict(pipeline.crops(frame), **pipeline.profile)
+                timer.lap("inference")
+                detections = pipeline.merge(results)
+            frame, status = pipeline.annotate(frame, detections)
+            encode_tiers(frame, tiers, viewers)
+            timer.lap("encode")
+            frame_times.append(time.perf_counter() - frame_started)
+            peak_rss = max(peak_rss, process.memory_info().rss)
+            index += 1
+        cap.release()
+        capture_writer.close()
+
+    if started_at is None or not frame_times:
+        parser.error("Tidak ada frame yang diukur, video terlalu pendek untuk warmup")
+    elapsed = time.perf_counter() - started_at
+    report = {
+        "camera": camera["id"],
+        "video": video,
+        "frames": len(frame_times),
+        "warmup": args.warmup,
+        "model": config["model"],
+        "backend": config["inference"]["backend"],
+        "detection": camera["detection"],
+        "gating": camera["gating"],
+        "roi": camera["roi"],
+        "frame_size": pipeline.layout.frame_size,
+        "tier": tier,
+        "fps": len(frame_times) / elapsed,
+        "frame": summarize(frame_times),
+        "stages": {stage: summarize(timer.samples[stage]) for stage in STAGES if timer.samples[stage]},
+        "peak_rss_mb": peak_rss / 1024 / 1024,
+        "captures": {"saved": pipeline.captures_saved, "dropped": pipeline.captures_dropped},
+        "environment": {
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+    }
+
+    print(f"Kamera {report['camera']}, {report['frames']} frame, {report['fps']:.1f} FPS, memori puncak {report['peak_rss_mb']:.0f} MB")
+    print(f"{'tahap':<12} {'n':>6} {'mean ms':>8} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'max ms':>7}")
+    for name, stats in [*report["stages"].items(), ("frame", report["frame"])]:
+        print(f"{name:<12} {stats['count']:>6} {stats['mean_ms']:>8.2f} {stats['p50_ms']:>7.2f} {stats['p95_ms']:>7.2f} {stats['p99_ms']:>7.2f} {stats['max_ms']:>7.2f}")
+
+    if args.json:
+        with open(args.json, "w") as report_file:
+            json.dump(report, report_file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
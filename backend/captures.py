@@ -0,0 +1,113 @@
+import cv2
+import os
+import queue
+import threading
+from datetime import datetime, timedelta
+
+# Akhir episode yang datang sebelum gambar pertamanya selesai ditulis disimpan sementara selama ini
+PENDING_END_TIME = timedelta(minutes=10)
+
+
+class CaptureWriter:
+    def __init__(self, directory, workers=2, max_queue=32, jpeg_quality=90, store=None):
+        self.directory = directory
+        self.store = store
+        self.max_queue = max_queue
+        self.jpeg_quality = jpeg_quality
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._pending_ends = {}
+        self._images_queued = 0
+        # Antrean tidak dibatasi supaya akhir episode tidak pernah terbuang; batas max_queue hanya untuk gambar
+        self._queue = queue.Queue()
+        os.makedirs(directory, exist_ok=True)
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, filename, image, episode=None):
+        # episode = (kamera, slot, id track, waktu mulai) untuk indeks; baris indeks baru ditulis setelah JPEG tersimpan
+        with self._lock:
+            if self._images_queued >= self.max_queue:
+                self.dropped += 1
+                return False
+            self._images_queued += 1
+        # Disalin dulu karena frame masih akan digambari setelah ini
+        self._queue.put(("image", (filename, image.copy(), episode)))
+        return True
+
+    def end_episode(self, camera, track_id, start_time, end_time):
+        if self.store is not None:
+            self._queue.put(("end", (camera, track_id, start_time, end_time)))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "queued": self._images_queued,
+            }
+
+    def close(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _record(self, filename, episode):
+        camera, slot, track_id, start_time = episode
+        with self._index_lock:
+            end_time, _ = self._pending_ends.pop((camera, track_id, start_time), (None, None))
+            self.store.record(camera, slot, track_id, start_time, filename, end_time)
+
+    def _end(self, camera, track_id, start_time, end_time):
+        with self._index_lock:
+            if self.store.end_episode(camera, track_id, start_time, end_time):
+                return
+            # Gambar episode ini belum selesai ditulis; akhir episode dipakai saat barisnya dibuat
+            now = datetime.now()
+            self._pending_ends[(camera, track_id, start_time)] = (end_time, now)
+            for key in [key for key, (_, added) in self._pending_ends.items() if now - added > PENDING_END_TIME]:
+                del self._pending_ends[key]
+
+    def _write(self, filename, image, episode):
+        path = os.path.join(self.directory, filename)
+        try:
+            ret, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ret:
+                raise ValueError("JPEG encoding failed")
+            with open(path, "wb") as image_file:
+                image_file.write(buffer.tobytes())
+        except (OSError, ValueError, cv2.error) as e:
+            with self._lock:
+                self.failed += 1
+            print(f"Gagal menyimpan gambar pelanggaran {path}: {e}")
+            return
+        if self.store is not None and episode is not None:
+            self._record(filename, episode)
+        with self._lock:
+            self.written += 1
+        print(f"Gambar pelanggaran disimpan: {path}")
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            kind, payload = item
+            try:
+                if kind == "image":
+                    self._write(*payload)
+                else:
+                    self._end(*payload)
+            except Exception as e:
+                # Kegagalan indeks (mis. database terkunci) tidak boleh mematikan thread penulis
+                print(f"Gagal memperbarui indeks pelanggaran: {e}")
+            finally:
+                if kind == "image":
+                    with self._lock:
+                        self._images_queued -= 1
@@ -0,0 +1,104 @@
+import json
+import os
+from layouts import LayoutStore, validate_areas
+
+CONFIG_PATH = os.environ.get("PARKVISION_CONFIG", "cameras.json")
+
+# Bagian konfigurasi yang bisa ditimpa per kamera
+CAMERA_DEFAULTS = {
+    "gating": {
+        "detect_every": 1,
+        "motion_threshold": None,
+        "pixel_delta": 25,
+    },
+    "roi": {
+        "enabled": False,
+        "margin": 60,
+        "tiles": 1,
+        "overlap": 0.2,
+    },
+    "tracker": {
+        "iou_threshold": 0.3,
+        "max_misses": 15,
+        "stable_distance": 10,
+    },
+    "decode": {
+        "buffer_size": 4,
+        "latest_only": None,
+        "loop": False,
+        "reconnect_delay": 1,
+        "max_reconnect_delay": 30,
+        "timeout_ms": 5000,
+    },
+    "frame": {
+        "width": 1020,
+        "height": 500,
+    },
+    "detection": {
+        "classes": ["car"],
+        "imgsz": 640,
+        "conf": 0.25,
+        "iou": 0.7,
+    },
+    "smoothing": {
+        "enter_frames": 3,
+        "leave_frames": 5,
+    },
+}
+
+
+def load_config(path=CONFIG_PATH):
+    with open(path, "r") as config_file:
+        config = json.load(config_file)
+
+    config.setdefault("capture_directory", os.path.join("images", "captures"))
+    config.setdefault("violation_db", "violations.db")
+    config.setdefault("occupancy_db", "occupancy.db")
+    config.setdefault("layout_directory", "layouts")
+    config.setdefault("model", "yolov8s.pt")
+    config.setdefault("processes", len(config["cameras"]))
+    config["processes"] = max(1, min(config["processes"], len(config["cameras"])))
+    config.setdefault("threads_per_process", max(1, (os.cpu_count() or 1) // config["processes"]))
+
+    for section, defaults in CAMERA_DEFAULTS.items():
+        config[section] = {**defaults, **config.get(section, {})}
+
+    inference = config.setdefault("inference", {})
+    inference.setdefault("backend", "ultralytics")
+    inference.setdefault("providers", ["CPUExecutionProvider"])
+
+    batch = config.setdefault("batch", {})
+    batch.setdefault("max_batch_size", 1)
+    batch.setdefault("max_wait_ms", 10)
+    batch.setdefault("max_inflight", 1)
+
+    captures = config.setdefault("captures", {})
+    captures.setdefault("dwell_seconds", 3)
+    captures.setdefault("refresh_seconds", None)
+    captures.setdefault("workers", 2)
+    captures.setdefault("max_queue", 32)
+    captures.setdefault("jpeg_quality", 90)
+
+    stream = config.setdefault("stream", {})
+    stream.setdefault("tiers", [
+        {"name": "high", "width": 1020, "quality": 85},
+        {"name": "medium", "width": 640, "quality": 70},
+        {"name": "low", "width": 320, "quality": 50},
+    ])
+    stream.setdefault("default_tier", stream["tiers"][0]["name"])
+    stream.setdefault("max_fps", 25)
+    stream.setdefault("annotate_idle", False)
+
+    layouts = LayoutStore(config["layout_directory"])
+    seen = set()
+    for camera in config["cameras"]:
+        for section in CAMERA_DEFAULTS:
+            camera[section] = {**config[section], **camera.get(section, {})}
+        if camera["id"] in seen:
+            raise ValueError(f"Duplicate camera id: {camera['id']}")
+        seen.add(camera["id"])
+        # Layout tersimpan terbaru menggantikan areas di cameras.json (versi 0)
+        layout = layouts.load(camera["id"])
+        camera["areas"] = layout["areas"] if layout is not None else validate_areas(camera["areas"])
+        camera["layout_version"] = layout["version"] if layout is not None else 0
+    return config
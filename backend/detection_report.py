@@ -0,0 +1,122 @@
+import argparse
+import itertools
+import json
+import time
+import cv2
+import numpy as np
+from backends import load_detector
+from config import load_config
+from postprocess import class_ids_for, count_areas, filter_boxes
+from slots import SlotLayout, fit_size, scale_areas
+
+
+def read_frames(source, count, stride, width=None, height=None):
+    cap = cv2.VideoCapture(source)
+    frames = []
+    index = 0
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if index % stride == 0:
+            size = fit_size((frame.shape[1], frame.shape[0]), width, height)
+            frames.append(frame if size == (frame.shape[1], frame.shape[0]) else cv2.resize(frame, size))
+        index += 1
+    cap.release()
+    return frames
+
+
+def slot_states(detections, layout, class_ids):
+    # 0 = kosong, 1 = terisi, 2 = melanggar; sama dengan status slot di pipeline
+    _, _, centroids = filter_boxes(detections, class_ids)
+    areas, is_violation = layout.locate(centroids)
+    area_counts, violations = count_areas(areas, is_violation, len(layout))
+    return np.where(violations > 0, 2, np.where(area_counts > 0, 1, 0))
+
+
+def run_profile(detector, frames, layout, class_ids, profile, warmup):
+    for frame in frames[:warmup]:
+        detector.predict([frame], **profile)
+    latencies = []
+    states = []
+    for frame in frames:
+        started = time.perf_counter()
+        detections = detector.predict([frame], **profile)[0]
+        latencies.append(time.perf_counter() - started)
+        states.append(slot_states(detections, layout, class_ids))
+    return np.array(latencies) * 1000, np.array(states)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Laporan akurasi slot vs latensi untuk beberapa profil deteksi")
+    parser.add_argument("--camera", help="id kamera di cameras.json (default: kamera pertama)")
+    parser.add_argument("--source", help="rekaman yang dipakai (default: sumber kamera)")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--stride", type=int, default=5, help="ambil satu frame setiap N frame")
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[320, 416, 512, 640])
+    parser.add_argument("--conf", type=float, nargs="+", default=[0.25, 0.4])
+    parser.add_argument("--reference-imgsz", type=int, default=640)
+    parser.add_argument("--min-agreement", type=float, default=0.99)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--json", help="simpan hasil lengkap ke file JSON")
+    args = parser.parse_args()
+
+    config = load_config()
+    camera = next((camera for camera in config["cameras"] if camera["id"] == args.camera), None) if args.camera else config["cameras"][0]
+    if camera is None:
+        parser.error(f"Unknown camera: {args.camera}")
+    with open("coco.txt", "r") as my_file:
+        class_list = my_file.read().split("\n")
+
+    detection = camera["detection"]
+    class_ids = class_ids_for(class_list, detection["classes"])
+    detector = load_detector(config)
+    frames = read_frames(args.source or camera["source"], args.frames, args.stride, camera["frame"]["width"], camera["frame"]["height"])
+    if not frames:
+        parser.error("Tidak ada frame yang bisa dibaca dari sumber video")
+    frame_size = (frames[0].shape[1], frames[0].shape[0])
+    layout = SlotLayout(scale_areas(camera["areas"], frame_size), frame_size)
+
+    # Acuan: semua 80 kelas COCO lalu disaring setelahnya, seperti pipeline sebelum ada profil deteksi
+    reference = {"classes": None, "imgsz": args.reference_imgsz, "conf": 0.25, "iou": detection["iou"]}
+    _, reference_states = run_profile(detector, frames, layout, class_ids, reference, args.warmup)
+
+    results = []
+    for imgsz, conf in itertools.product(args.imgsz, args.conf):
+        profile = {"classes": tuple(class_ids.tolist()), "imgsz": imgsz, "conf": conf, "iou": detection["iou"]}
+        latencies, states = run_profile(detector, frames, layout, class_ids, profile, args.warmup)
+        occupied = (states > 0).sum(1)
+        reference_occupied = (reference_states > 0).sum(1)
+        results.append({
+            "imgsz": imgsz,
+            "conf": conf,
+            "latency_ms_mean": float(latencies.mean()),
+            "latency_ms_p50": float(np.percentile(latencies, 50)),
+            "latency_ms_p95": float(np.percentile(latencies, 95)),
+            "slot_agreement": float((states == reference_states).mean()),
+            "frame_agreement": float((states == reference_states).all(1).mean()),
+            "count_error": float(np.abs(occupied - reference_occupied).mean()),
+        })
+
+    results.sort(key=lambda result: result["latency_ms_mean"])
+    print(f"Kamera {camera['id']}, {len(frames)} frame, acuan imgsz={args.reference_imgsz} semua kelas")
+    print(f"{'imgsz':>6} {'conf':>5} {'mean ms':>8} {'p50 ms':>7} {'p95 ms':>7} {'slot %':>7} {'frame %':>8} {'count err':>9}")
+    for result in results:
+        print(
+            f"{result['imgsz']:>6} {result['conf']:>5.2f} {result['latency_ms_mean']:>8.1f} {result['latency_ms_p50']:>7.1f} "
+            f"{result['latency_ms_p95']:>7.1f} {result['slot_agreement'] * 100:>7.1f} {result['frame_agreement'] * 100:>8.1f} {result['count_error']:>9.2f}"
+        )
+
+    recommended = next((result for result in results if result["slot_agreement"] >= args.min_agreement), None)
+    if recommended is not None:
+        print(f"Profil termurah dengan kecocokan slot >= {args.min_agreement:.0%}: imgsz={recommended['imgsz']} conf={recommended['conf']}")
+    else:
+        print(f"Tidak ada profil dengan kecocokan slot >= {args.min_agreement:.0%}")
+
+    if args.json:
+        with open(args.json, "w") as report_file:
+            json.dump({"camera": camera["id"], "frames": len(frames), "reference": reference, "results": results, "recommended": recommended}, report_file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
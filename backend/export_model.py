@@ -0,0 +1,27 @@
+import argparse
+from pathlib import Path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ekspor model YOLO ke ONNX untuk backend inferensi onnxruntime")
+    parser.add_argument("--weights", default="yolov8s.pt")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--dynamic", action="store_true", help="ukuran batch dinamis, dipakai kalau max_batch_size > 1")
+    parser.add_argument("--int8", action="store_true", help="buat juga versi INT8 (kuantisasi dinamis)")
+    args = parser.parse_args()
+
+    from ultralytics import YOLO
+
+    path = YOLO(args.weights).export(format="onnx", imgsz=args.imgsz, dynamic=args.dynamic, simplify=True)
+    print(f"Model ONNX disimpan: {path}")
+
+    if args.int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized = Path(path).with_name(f"{Path(path).stem}-int8.onnx")
+        quantize_dynamic(path, quantized, weight_type=QuantType.QUInt8)
+        print(f"Model INT8 disimpan: {quantized}")
+
+
+if __name__ == "__main__":
+    main()
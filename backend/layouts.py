@@ -0,0 +1,91 @@
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+VERSION_FILE = re.compile(r"^v(\d+)\.json$")
+# Batas bawah ukuran slot dalam koordinat normal, di bawahnya garis lajur tidak bisa dihitung
+MIN_SLOT_SIZE = 0.001
+POINT_ORDER = "top-left, bottom-left, bottom-right, top-right"
+
+
+def validate_areas(areas):
+    if not isinstance(areas, dict) or not areas:
+        raise ValueError("areas must be a non-empty object of slot name to polygon")
+    validated = {}
+    for name, coords in areas.items():
+        if not isinstance(name, str) or not name:
+            raise ValueError("slot names must be non-empty strings")
+        if not isinstance(coords, list) or len(coords) != 4:
+            raise ValueError(f"slot {name} must have exactly 4 points")
+        points = []
+        for point in coords:
+            if (
+                not isinstance(point, (list, tuple)) or len(point) != 2
+                or not all(isinstance(value, (int, float)) and not isinstance(value, bool) and 0 <= value <= 1 for value in point)
+            ):
+                raise ValueError(f"slot {name} points must be normalized [x, y] values between 0 and 1")
+            points.append((float(point[0]), float(point[1])))
+        # Garis lajur diambil dari tepi atas (titik 0 dan 3) dan tepi bawah (titik 1 dan 2), jadi urutan titik menentukan
+        (x0, y0), (x1, y1), (x2, y2), (x3, y3) = points
+        area = abs((x0 - x2) * (y1 - y3) - (x1 - x3) * (y0 - y2)) / 2
+        if (
+            area < MIN_SLOT_SIZE ** 2 or (y1 + y2) / 2 - (y0 + y3) / 2 < MIN_SLOT_SIZE
+            or x3 - x0 < MIN_SLOT_SIZE or x2 - x1 < MIN_SLOT_SIZE
+        ):
+            raise ValueError(f"slot {name} points must be ordered {POINT_ORDER} and enclose a non-empty area")
+        validated[name] = points
+    return validated
+
+
+class LayoutStore:
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _camera_directory(self, camera_id):
+        return os.path.join(self.directory, camera_id)
+
+    def versions(self, camera_id):
+        try:
+            names = os.listdir(self._camera_directory(camera_id))
+        except FileNotFoundError:
+            return []
+        return sorted(int(match.group(1)) for match in map(VERSION_FILE.match, names) if match)
+
+    def load(self, camera_id, version=None):
+        if version is None:
+            versions = self.versions(camera_id)
+            if not versions:
+                return None
+            version = versions[-1]
+        try:
+            with open(os.path.join(self._camera_directory(camera_id), f"v{version}.json"), "r") as layout_file:
+                layout = json.load(layout_file)
+        except FileNotFoundError:
+            return None
+        layout["areas"] = {name: [tuple(point) for point in coords] for name, coords in layout["areas"].items()}
+        return layout
+
+    def save(self, camera_id, areas):
+        areas = validate_areas(areas)
+        directory = self._camera_directory(camera_id)
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            versions = self.versions(camera_id)
+            version = versions[-1] + 1 if versions else 1
+            layout = {
+                "camera": camera_id,
+                "version": version,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "areas": {name: [list(point) for point in coords] for name, coords in areas.items()},
+            }
+            # Ditulis ke file sementara dulu supaya pembaca tidak pernah melihat file setengah jadi
+            path = os.path.join(directory, f"v{version}.json")
+            temporary = path + ".tmp"
+            with open(temporary, "w") as layout_file:
+                json.dump(layout, layout_file, indent=4)
+            os.replace(temporary, path)
+        layout["areas"] = areas
+        return layout
@@ -0,0 +1,109 @@
+import bisect
+import time
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histogram:
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.buckets = buckets
+        # Slot terakhir untuk nilai di atas bucket terbesar (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def snapshot(self):
+        return {"buckets": self.buckets, "counts": list(self.counts), "sum": self.sum}
+
+
+class HistogramTimer:
+    def __init__(self):
+        self.histograms = {}
+        self._last = time.perf_counter()
+
+    def start(self):
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.record(stage, now - self._last)
+        self._last = now
+
+    def record(self, stage, seconds):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms.setdefault(stage, Histogram())
+        histogram.observe(seconds)
+
+    def snapshot(self):
+        return {stage: histogram.snapshot() for stage, histogram in list(self.histograms.items())}
+
+
+def _labels(labels):
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels.items()) + "}"
+
+
+def _format(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class MetricsWriter:
+    def __init__(self):
+        self._families = {}
+
+    def add(self, name, kind, help_text, labels, value):
+        family = self._families.setdefault(name, (kind, help_text, []))
+        family[2].append((labels, value))
+
+    def render(self):
+        lines = []
+        for name, (kind, help_text, samples) in self._families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if kind != "histogram":
+                    lines.append(f"{name}{_labels(labels)} {_format(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip([*value["buckets"], "+Inf"], value["counts"]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_format(value['sum'])}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def render_metrics(workers, status_hub):
+    writer = MetricsWriter()
+    writer.add("parkvision_status_stream_clients", "gauge", "Connected status SSE clients", {}, status_hub.subscriber_count())
+    for camera_id, worker in workers.items():
+        camera = {"camera": camera_id}
+        writer.add("parkvision_camera_up", "gauge", "Whether the camera pipeline is running", camera, int(worker.is_alive()))
+        for tier, viewers in worker.viewers_by_tier().items():
+            writer.add("parkvision_stream_clients", "gauge", "Connected video stream clients per quality tier", {**camera, "tier": tier}, viewers)
+
+        snapshot = worker.metrics
+        if snapshot is None:
+            continue
+        counters = snapshot["counters"]
+        writer.add("parkvision_frames_processed_total", "counter", "Frames processed by the camera pipeline", camera, counters["frames_processed"])
+        writer.add("parkvision_frames_detected_total", "counter", "Frames sent through the detection model", camera, counters["frames_detected"])
+        for reason in ("decode", "queue"):
+            writer.add("parkvision_frames_dropped_total", "counter", "Frames dropped before reaching viewers", {**camera, "reason": reason}, counters[f"frames_dropped_{reason}"])
+        writer.add("parkvision_captures_saved_total", "counter", "Violation captures queued for writing", camera, counters["captures_saved"])
+        writer.add("parkvision_captures_dropped_total", "counter", "Violation captures dropped because the write queue was full", camera, counters["captures_dropped"])
+        writer.add("parkvision_source_reconnects_total", "counter", "Video source reconnect attempts", camera, counters["source_reconnects"])
+
+        gauges = snapshot["gauges"]
+        writer.add("parkvision_source_fps", "gauge", "Current video source frame rate", camera, gauges["source_fps"])
+        writer.add("parkvision_inference_queue_depth", "gauge", "Inference requests waiting in the camera process batch scheduler", camera, gauges["inference_queue_depth"])
+        writer.add("parkvision_capture_queue_size", "gauge", "Violation captures waiting to be written in the camera process", camera, gauges["capture_queue_size"])
+
+        for stage, histogram in snapshot["stages"].items():
+            writer.add("parkvision_stage_seconds", "histogram", "Time spent in each frame processing stage", {**camera, "stage": stage}, histogram)
+    return writer.render()
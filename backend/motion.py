@@ -0,0 +1,38 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    def __init__(self, layout, detect_every=1, motion_threshold=None, pixel_delta=25, scale=0.25):
+        self.detect_every = max(1, detect_every)
+        self.motion_threshold = motion_threshold
+        self.pixel_delta = pixel_delta
+        width, height = layout.frame_size
+        self.size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        mask = cv2.resize((layout.slot_mask > 0).astype(np.uint8), self.size, interpolation=cv2.INTER_NEAREST)
+        self.mask = mask.astype(bool)
+        self.mask_pixels = max(1, int(np.count_nonzero(self.mask)))
+        self.reference = None
+        self.frames_since_detection = None
+
+    def _thumbnail(self, frame):
+        return cv2.cvtColor(cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+
+    def should_detect(self, frame):
+        thumbnail = self._thumbnail(frame) if self.motion_threshold is not None else None
+        if self.frames_since_detection is not None:
+            self.frames_since_detection += 1
+            if self.frames_since_detection < self.detect_every and not self._moved(thumbnail):
+                return False
+
+        self.frames_since_detection = 0
+        self.reference = thumbnail
+        return True
+
+    def _moved(self, thumbnail):
+        if thumbnail is None:
+            return False
+        # Dibandingkan dengan frame deteksi terakhir supaya perubahan pelan tetap terakumulasi
+        diff = cv2.absdiff(thumbnail, self.reference)
+        changed = np.count_nonzero(diff[self.mask] > self.pixel_delta) / self.mask_pixels
+        return changed >= self.motion_threshold
@@ -0,0 +1,218 @@
+import bisect
+import math
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS slot_transitions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    camera TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    state INTEGER NOT NULL,
+    time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS slot_transitions_slot_time ON slot_transitions (camera, slot, time);
+CREATE INDEX IF NOT EXISTS slot_transitions_time ON slot_transitions (time);
+CREATE TABLE IF NOT EXISTS occupancy_rollups (
+    resolution INTEGER NOT NULL,
+    bucket REAL NOT NULL,
+    camera TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    empty_seconds REAL NOT NULL DEFAULT 0,
+    occupied_seconds REAL NOT NULL DEFAULT 0,
+    violation_seconds REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (resolution, bucket, camera, slot)
+) WITHOUT ROWID;
+"""
+
+RESOLUTIONS = {"minute": 60, "hour": 3600}
+DWELL_BUCKETS = (300, 900, 1800, 3600, 7200, 14400)
+
+
+def split_buckets(start, end, size):
+    bucket = math.floor(start / size) * size
+    while bucket < end:
+        yield bucket, min(end, bucket + size) - max(start, bucket)
+        bucket += size
+
+
+def utilization(row):
+    observed = row["empty_seconds"] + row["occupied_seconds"] + row["violation_seconds"]
+    return (row["occupied_seconds"] + row["violation_seconds"]) / observed if observed else None
+
+
+def dwell_summary(durations):
+    durations = sorted(durations)
+    counts = [0] * (len(DWELL_BUCKETS) + 1)
+    for duration in durations:
+        counts[bisect.bisect_left(DWELL_BUCKETS, duration)] += 1
+    return {
+        "count": len(durations),
+        "mean_seconds": sum(durations) / len(durations) if durations else None,
+        "median_seconds": durations[len(durations) // 2] if durations else None,
+        "p90_seconds": durations[int(len(durations) * 0.9)] if durations else None,
+        "histogram": [{"le_seconds": bound, "count": count} for bound, count in zip([*DWELL_BUCKETS, None], counts)],
+    }
+
+
+class OccupancyStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(SCHEMA)
+        # Tulisan dari proses kamera dikerjakan thread ini supaya thread kamera tidak menunggu kunci database
+        self._pending = queue.Queue()
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+
+    def submit(self, camera, transitions, intervals):
+        self._pending.put((camera, transitions, intervals))
+
+    def close(self):
+        self._pending.put(None)
+        self._writer.join()
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            camera, transitions, intervals = item
+            try:
+                self.write(camera, transitions, intervals)
+            except sqlite3.Error as e:
+                print(f"Gagal menyimpan riwayat okupansi kamera {camera}: {e}")
+
+    def write(self, camera, transitions, intervals):
+        # Durasi tiap status langsung dijumlahkan ke bucket menit dan jam
+        rows = []
+        for slot, state, start, end in intervals:
+            for size in RESOLUTIONS.values():
+                for bucket, seconds in split_buckets(start, end, size):
+                    values = [0.0, 0.0, 0.0]
+                    values[state] = seconds
+                    rows.append((size, bucket, camera, slot, *values))
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO slot_transitions (camera, slot, state, time) VALUES (?, ?, ?, ?)",
+                [(camera, slot, state, when) for slot, state, when in transitions],
+            )
+            self._connection.executemany(
+                "INSERT INTO occupancy_rollups (resolution, bucket, camera, slot, empty_seconds, occupied_seconds, violation_seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (resolution, bucket, camera, slot) DO UPDATE SET "
+                "empty_seconds = empty_seconds + excluded.empty_seconds, "
+                "occupied_seconds = occupied_seconds + excluded.occupied_seconds, "
+                "violation_seconds = violation_seconds + excluded.violation_seconds",
+                rows,
+            )
+
+    def _filters(self, camera, slot):
+        clauses = []
+        params = []
+        if camera is not None:
+            clauses.append("camera = ?")
+            params.append(camera)
+        if slot is not None:
+            clauses.append("slot = ?")
+            params.append(slot)
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+    def rollups(self, start, end, resolution, camera=None, slot=None):
+        where, params = self._filters(camera, slot)
+        with self._lock:
+            series = self._connection.execute(
+                "SELECT bucket, SUM(empty_seconds) AS empty_seconds, SUM(occupied_seconds) AS occupied_seconds, "
+                "SUM(violation_seconds) AS violation_seconds FROM occupancy_rollups "
+                f"WHERE resolution = ? AND bucket >= ? AND bucket < ?{where} GROUP BY bucket ORDER BY bucket",
+                [RESOLUTIONS[resolution], start, end] + params,
+            ).fetchall()
+            slots = self._connection.execute(
+                "SELECT camera, slot, SUM(empty_seconds) AS empty_seconds, SUM(occupied_seconds) AS occupied_seconds, "
+                "SUM(violation_seconds) AS violation_seconds FROM occupancy_rollups "
+                f"WHERE resolution = ? AND bucket >= ? AND bucket < ?{where} GROUP BY camera, slot ORDER BY camera, slot",
+                [RESOLUTIONS[resolution], start, end] + params,
+            ).fetchall()
+        return [dict(row) for row in series], [dict(row) for row in slots]
+
+    def dwell_times(self, start, end, camera=None, slot=None):
+        # Satu episode = slot terisi (termasuk melanggar) sampai kembali kosong
+        where, params = self._filters(camera, slot)
+        with self._lock:
+            # Status terakhir sebelum rentang dibutuhkan untuk tahu slot mana yang sudah terisi di awal rentang
+            rows = self._connection.execute(
+                f"SELECT camera, slot, state, MAX(time) AS time FROM slot_transitions WHERE time < ?{where} GROUP BY camera, slot "
+                f"UNION ALL SELECT camera, slot, state, time FROM slot_transitions WHERE time >= ? AND time < ?{where} "
+                "ORDER BY camera, slot, time",
+                [start] + params + [start, end] + params,
+            ).fetchall()
+
+        durations = []
+        occupied_since = {}
+        for row in rows:
+            key = (row["camera"], row["slot"])
+            if row["state"] > 0:
+                occupied_since.setdefault(key, row["time"])
+            elif key in occupied_since:
+                since = occupied_since.pop(key)
+                if since >= start:
+                    durations.append(row["time"] - since)
+        return durations
+
+
+class OccupancyRecorder:
+    def __init__(self, store, camera_id, slot_names, flush_seconds=60):
+        self.store = store
+        self.camera_id = camera_id
+        self.slot_names = slot_names
+        self.flush_seconds = flush_seconds
+        self.states = None
+        self.since = None
+        self.flushed_at = None
+        # Transisi dan interval dikumpulkan di memori lalu dikirim sekaligus setiap flush
+        self.transitions = []
+        self.intervals = []
+
+    def update(self, states, changed):
+        now = time.time()
+        if self.states is None:
+            self.states = states.copy()
+            self.since = [now] * len(states)
+            self.flushed_at = now
+            self.transitions.extend((name, state, now) for name, state in zip(self.slot_names, states.tolist()))
+            return
+
+        if changed.any():
+            for slot in changed.nonzero()[0].tolist():
+                self.intervals.append((self.slot_names[slot], int(self.states[slot]), self.since[slot], now))
+                self.transitions.append((self.slot_names[slot], int(states[slot]), now))
+                self.since[slot] = now
+            self.states = states.copy()
+        if now - self.flushed_at >= self.flush_seconds:
+            self.flush(now)
+
+    def reset(self, slot_names):
+        # Layout slot diganti: interval lama ditutup, status slot baru dicatat lagi dari awal pada update berikutnya
+        self.flush()
+        self.slot_names = slot_names
+        self.states = None
+
+    def flush(self, now=None):
+        # Interval yang masih terbuka ikut dijumlahkan supaya rollup tidak tertinggal dari waktu sekarang
+        if self.states is None:
+            return
+        now = now or time.time()
+        intervals = self.intervals + [
+            (name, state, since, now) for name, state, since in zip(self.slot_names, self.states.tolist(), self.since) if since < now
+        ]
+        self.since = [now] * len(self.since)
+        self.flushed_at = now
+        self.store.submit(self.camera_id, self.transitions, intervals)
+        self.transitions = []
+        self.intervals = []
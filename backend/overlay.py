@@ -0,0 +1,66 @@
+import cv2
+import numpy as np
+
+# Hijau: kosong, biru: terisi, merah: ada pelanggaran (urutan sama dengan SLOT_STATES)
+STATE_COLORS = ((0, 255, 0), (255, 0, 0), (0, 0, 255))
+
+
+class LayoutOverlay:
+    def __init__(self, layout, state_colors=STATE_COLORS):
+        width, height = layout.frame_size
+        self.frame_size = layout.frame_size
+        self.palette = np.array(state_colors, np.uint8)
+
+        # Garis poligon hanya berganti warna mengikuti status, jadi yang disimpan cukup piksel dan pemilik slotnya
+        owner = np.full((height, width), -1, np.int32)
+        mask = np.zeros((height, width), np.uint8)
+        for slot, polygon in enumerate(layout.polygons):
+            mask[:] = 0
+            cv2.polylines(mask, [polygon], True, 255, 2)
+            owner[mask > 0] = slot
+        self.outline_index = np.flatnonzero(owner >= 0)
+        self.outline_slots = owner.ravel()[self.outline_index]
+
+        # Garis lajur, lingkaran dan nomor slot tidak pernah berubah. Digambar sekali di atas latar hitam dan putih
+        # supaya piksel anti-aliasing bisa dicampur dengan frame: hasil = hitam + (putih - hitam) * frame / 255
+        black = np.zeros((height, width, 3), np.uint8)
+        white = np.full((height, width, 3), 255, np.uint8)
+        for canvas in (black, white):
+            for slot in range(len(layout)):
+                for start_point, end_point in layout.draw_lines[slot]:
+                    cv2.line(canvas, start_point, end_point, (0, 255, 255), 2)
+                circle_center = layout.label_centers[slot]
+                cv2.circle(canvas, circle_center, 15, (255, 255, 255), -1)
+                cv2.putText(canvas, str(slot + 1), circle_center, cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 255), 1, cv2.LINE_AA)
+        black = black.reshape(-1, 3)
+        white = white.reshape(-1, 3)
+        drawn = (black != 0).any(axis=1) | (white != 255).any(axis=1)
+        opaque = drawn & (black == white).all(axis=1)
+        self.opaque_index = np.flatnonzero(opaque)
+        self.opaque_colors = black[self.opaque_index]
+        self.blend_index = np.flatnonzero(drawn & ~opaque)
+        self.blend_base = black[self.blend_index].astype(np.float32)
+        self.blend_scale = (white[self.blend_index].astype(np.float32) - self.blend_base) / 255
+
+        # Layer siap tempel beserta masknya; hanya diwarnai ulang saat status slot berubah
+        self.layer = np.zeros((height, width, 3), np.uint8)
+        self.mask = np.zeros((height, width), np.uint8)
+        self.mask.reshape(-1)[self.outline_index] = 255
+        self.mask.reshape(-1)[self.opaque_index] = 255
+        self.states = None
+
+    def _recolor(self, states):
+        pixels = self.layer.reshape(-1, 3)
+        pixels[self.outline_index] = self.palette[states[self.outline_slots]]
+        pixels[self.opaque_index] = self.opaque_colors
+        self.states = states.copy()
+
+    def draw(self, frame, states):
+        if self.states is None or not np.array_equal(states, self.states):
+            self._recolor(states)
+        cv2.copyTo(self.layer, self.mask, frame)
+        if len(self.blend_index):
+            pixels = frame.reshape(-1, 3)
+            under = pixels[self.blend_index].astype(np.float32)
+            pixels[self.blend_index] = np.clip(self.blend_base + self.blend_scale * under + 0.5, 0, 255).astype(np.uint8)
+        return frame
@@ -0,0 +1,201 @@
+import cv2
+import numpy as np
+from datetime import datetime, timedelta
+from postprocess import class_ids_for, count_areas, filter_boxes, merge_overlapping
+from motion import MotionGate
+from overlay import LayoutOverlay
+from slots import SlotLayout, fit_size, scale_areas
+from smoothing import SLOT_STATES, SlotStateMachine, observed_states
+from timing import NullTimer
+from tracker import Tracker
+
+
+class CameraPipeline:
+    def __init__(self, camera_id, areas, class_list, capture_writer, gating=None, roi=None, tracker=None, captures=None, detection=None, timer=None, smoothing=None, occupancy=None, frame=None):
+        self.camera_id = camera_id
+        self.gating = gating or {}
+        self.roi = roi
+        self.smoothing = smoothing or {}
+        self.occupancy = occupancy
+        frame = frame or {}
+        self.frame_width = frame.get("width")
+        self.frame_height = frame.get("height")
+        self.last_detections = None
+        self.tracker = Tracker(**(tracker or {}))
+        # Koordinat slot dinormalisasi; geometri piksel baru dibuat setelah ukuran frame pertama diketahui
+        self.areas = areas
+        self.slot_names = list(areas)
+        self.layout = None
+        self.relocate = False
+        self.slot_states = SlotStateMachine(len(areas), **self.smoothing)
+        detection = detection or {}
+        self.class_ids = class_ids_for(class_list, detection.get("classes", ["car"]))
+        if not len(self.class_ids):
+            raise ValueError(f"Unknown detection classes for camera {camera_id}: {detection.get('classes')}")
+        # Kelas lain sudah dibuang di tahap NMS model, bukan setelah semua 80 kelas diproses
+        self.profile = {
+            "classes": tuple(self.class_ids.tolist()),
+            "imgsz": detection.get("imgsz", 640),
+            "conf": detection.get("conf", 0.25),
+            "iou": detection.get("iou", 0.7),
+        }
+        self.capture_writer = capture_writer
+        captures = captures or {}
+        self.dwell_time = timedelta(seconds=captures.get("dwell_seconds", 3))
+        refresh_seconds = captures.get("refresh_seconds")
+        self.refresh_time = timedelta(seconds=refresh_seconds) if refresh_seconds else None
+        self.captures_saved = 0
+        self.captures_dropped = 0
+        self.timer = timer if timer is not None else NullTimer()
+
+    def _build_layout(self, frame_size):
+        layout = SlotLayout(scale_areas(self.areas, frame_size), frame_size)
+        if self.roi and self.roi["enabled"]:
+            regions = layout.regions(self.roi["margin"], self.roi["tiles"], self.roi["overlap"])
+        else:
+            regions = [(0, 0) + layout.frame_size]
+        # Semua geometri dihitung dulu, baru dipasang bersamaan supaya frame tidak melihat campuran layout lama dan baru
+        self.layout, self.overlay, self.gate, self.regions = layout, LayoutOverlay(layout), MotionGate(layout, **self.gating), regions
+        # Indeks slot lama tidak berlaku lagi, jadi semua mobil yang dilacak dicari ulang slotnya pada update berikutnya.
+        # Tidak lewat track.moved karena nilai itu dihitung ulang oleh tracker dan mobil yang diam akan terlewat
+        self.relocate = True
+
+    def set_layout(self, areas):
+        self.areas = areas
+        self.slot_names = list(areas)
+        self.slot_states = SlotStateMachine(len(areas), **self.smoothing)
+        if self.layout is not None:
+            self._build_layout(self.layout.frame_size)
+        if self.occupancy is not None:
+            self.occupancy.reset(self.slot_names)
+
+    def prepare(self, frame):
+        # Frame hanya di-resize jika ukuran dikonfigurasi; tanpa width/height frame dipakai apa adanya
+        height, width = frame.shape[:2]
+        size = fit_size((width, height), self.frame_width, self.frame_height)
+        if size == (width, height):
+            return frame
+        return cv2.resize(frame, size)
+
+    def fit(self, frame):
+        # Dipanggil di thread kamera sebelum frame diproses; geometri dibangun ulang jika ukuran frame berubah
+        height, width = frame.shape[:2]
+        if self.layout is None or self.layout.frame_size != (width, height):
+            self._build_layout((width, height))
+
+    def crops(self, frame):
+        return [frame[y0:y1, x0:x1] for x0, y0, x1, y1 in self.regions]
+
+    def merge(self, results, regions=None):
+        regions = regions or self.regions
+        detections = []
+        for data, (x0, y0, x1, y1) in zip(results, regions):
+            data[:, [0, 2]] += x0
+            data[:, [1, 3]] += y0
+            detections.append(data)
+        detections = np.concatenate(detections)
+        if len(regions) > 1:
+            detections = merge_overlapping(detections)
+        return detections
+
+    def _capture_due(self, track, now):
+        if track.captured_at is None:
+            return True
+        return self.refresh_time is not None and now - track.captured_at >= self.refresh_time
+
+    def _capture(self, track, image, now):
+        # Kotak di tepi frame bisa menghasilkan potongan kosong; dicoba lagi di frame berikutnya
+        if image.size == 0:
+            return
+        # Satu gambar per episode pelanggaran, bukan satu gambar per frame
+        track.captured_at = now
+        filename = f"pelanggaran_{self.camera_id}-{track.id}_{now.strftime('%Y%m%d_%H%M%S')}.jpg"
+        slot = self.layout.names[track.slot] if track.slot >= 0 else None
+        # Indeks SQLite ditulis oleh thread CaptureWriter, bukan di thread kamera
+        if self.capture_writer.submit(filename, image, (self.camera_id, slot, track.id, track.violation_since)):
+            self.captures_saved += 1
+        else:
+            self.captures_dropped += 1
+
+    def _end_violation(self, track, now):
+        if track.captured_at is not None:
+            self.capture_writer.end_episode(self.camera_id, track.id, track.violation_since, now)
+        track.violation_since = None
+        track.captured_at = None
+
+    def update(self, detections=None):
+        # Pelacakan dan penentuan slot saja, tanpa menggambar; dipakai juga oleh analisis offline
+        if detections is None:
+            detections = self.last_detections
+        self.last_detections = detections
+        layout = self.layout
+        _, boxes, _ = filter_boxes(detections, self.class_ids)
+        tracks = self.tracker.update(boxes)
+        self.timer.lap("postprocess")
+
+        if self.relocate:
+            moved = list(self.tracker.tracks)
+            self.relocate = False
+        else:
+            moved = [track for track in tracks if track.moved]
+        if moved:
+            slots, is_violation = layout.locate(np.array([track.centroid for track in moved], np.int32))
+            for track, slot, violation in zip(moved, slots.tolist(), is_violation.tolist()):
+                track.slot = slot
+                track.is_violation = violation
+
+        car_areas = np.array([track.slot for track in tracks], np.int32)
+        is_violation = np.array([track.is_violation for track in tracks], bool)
+        area_counts, violations = count_areas(car_areas, is_violation, len(layout))
+        # Status slot diperhalus supaya satu deteksi yang terlewat tidak langsung membalik status
+        changed = self.slot_states.update(observed_states(area_counts, violations))
+        if self.occupancy is not None:
+            self.occupancy.update(self.slot_states.state, changed)
+        self.timer.lap("slots")
+        return tracks, self.slot_states.state.copy()
+
+    def annotate(self, frame, detections=None, draw=True):
+        tracks, states = self.update(detections)
+        layout = self.layout
+        now = datetime.now()
+
+        for track in tracks:
+            x1, y1, x2, y2 = track.box
+            cx, cy = track.centroid
+            if draw:
+                box_color = (255, 255, 255) if not track.is_violation else (0, 0, 255)
+                cv2.rectangle(frame, (x1, y1), (x2, y2), box_color, 2)
+                cv2.circle(frame, (cx, cy), 3, box_color, -1)
+
+            if track.is_violation:
+                if track.violation_since is None:
+                    track.violation_since = now
+                elif now - track.violation_since >= self.dwell_time and self._capture_due(track, now):
+                    self._capture(track, frame[max(y1, 0):y2, max(x1, 0):x2], now)
+            elif track.violation_since is not None:
+                self._end_violation(track, now)
+
+        for track in self.tracker.expired:
+            if track.violation_since is not None:
+                self._end_violation(track, now)
+
+        violation_slots = int(np.count_nonzero(states == 2))
+        occupied_slots = int(np.count_nonzero(states == 1))
+        empty_slots = len(layout) - violation_slots - occupied_slots
+
+        # Layout slot sudah dirender sekali di LayoutOverlay, per frame tinggal ditempel sesuai status
+        if draw:
+            self.overlay.draw(frame, states)
+
+        status = {
+            "empty_slots": empty_slots,
+            "occupied_slots": occupied_slots,
+            "violation_slots": violation_slots,
+            "slots": {name: SLOT_STATES[state] for name, state in zip(layout.names, states.tolist())},
+            "captures": {
+                "saved": self.captures_saved,
+                "dropped": self.captures_dropped
+            }
+        }
+        self.timer.lap("draw")
+        return frame, status
@@ -0,0 +1,35 @@
+import cv2
+import numpy as np
+
+
+def class_ids_for(class_list, class_names):
+    return np.array([class_id for class_id, name in enumerate(class_list) if name in class_names], np.int32)
+
+
+def boxes_to_array(result):
+    data = result.boxes.data
+    if hasattr(data, "cpu"):
+        data = data.cpu().numpy()
+    return np.asarray(data, np.float32).reshape(-1, 6)
+
+
+def merge_overlapping(data, iou_threshold=0.5):
+    if len(data) < 2:
+        return data
+    boxes = np.column_stack([data[:, :2], data[:, 2:4] - data[:, :2]]).tolist()
+    keep = cv2.dnn.NMSBoxes(boxes, data[:, 4].tolist(), 0.0, iou_threshold)
+    return data[np.asarray(keep, np.int32).reshape(-1)]
+
+
+def filter_boxes(data, class_ids):
+    indices = np.flatnonzero(np.isin(data[:, 5].astype(np.int32), class_ids))
+    boxes = data[indices, :4].astype(np.int32)
+    centroids = (boxes[:, :2] + boxes[:, 2:]) // 2
+    return indices, boxes, centroids
+
+
+def count_areas(area_index, is_violation, area_count):
+    inside = area_index >= 0
+    area_counts = np.bincount(area_index[inside], minlength=area_count)
+    violations = np.bincount(area_index[inside & is_violation], minlength=area_count)
+    return area_counts, violations
@@ -0,0 +1,24 @@
+import argparse
+import uvicorn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Menjalankan server ParkVision (ASGI) untuk produksi")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--shutdown-timeout", type=int, default=5)
+    args = parser.parse_args()
+
+    # Satu proses web saja: proses kamera dijalankan dari lifespan aplikasi ini
+    uvicorn.run(
+        "asgi:app",
+        host=args.host,
+        port=args.port,
+        lifespan="on",
+        timeout_graceful_shutdown=args.shutdown_timeout,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import numpy as np
+
+
+def fit_size(native_size, width=None, height=None):
+    # Ukuran frame yang dipakai pipeline; dimensi yang kosong mengikuti rasio aspek asli
+    native_width, native_height = native_size
+    if width is None and height is None:
+        return native_width, native_height
+    if width is None:
+        width = max(1, round(native_width * height / native_height))
+    elif height is None:
+        height = max(1, round(native_height * width / native_width))
+    return width, height
+
+
+def scale_areas(areas, frame_size):
+    # Koordinat layout dinormalisasi (0..1), dipetakan ke piksel sesuai ukuran frame kamera
+    scale = np.array(frame_size, np.float64)
+    return {name: [tuple(point) for point in np.round(np.array(coords, np.float64) * scale).astype(int).tolist()] for name, coords in areas.items()}
+
+
+def lane_lines(polygons, line_spacing):
+    polygons = polygons.astype(np.float32)
+    width_top = polygons[:, 3, 0] - polygons[:, 0, 0]
+    width_bottom = polygons[:, 2, 0] - polygons[:, 1, 0]
+    ratios = np.array([line_spacing, 1 - line_spacing], np.float32)
+    top_x = polygons[:, 0, 0][:, None] + ratios[None, :] * width_top[:, None]
+    bottom_x = polygons[:, 1, 0][:, None] + ratios[None, :] * width_bottom[:, None]
+    top_y = (polygons[:, 0, 1] + polygons[:, 3, 1]) / 2
+    bottom_y = (polygons[:, 1, 1] + polygons[:, 2, 1]) / 2
+    return top_x, bottom_x, top_y, bottom_y
+
+
+def inside_polygon(xs, ys, polygon):
+    # Setara dengan cv2.pointPolygonTest(...) >= 0, termasuk titik di tepi poligon
+    xs = xs.astype(np.float32)
+    ys = ys.astype(np.float32)
+    polygon = polygon.astype(np.float32)
+    inside = np.zeros(xs.shape, bool)
+    on_edge = np.zeros(xs.shape, bool)
+    for (x1, y1), (x2, y2) in zip(polygon, np.roll(polygon, -1, axis=0)):
+        crosses = (y1 > ys) != (y2 > ys)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_cross = x1 + (ys - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (xs < x_cross)
+        cross = (x2 - x1) * (ys - y1) - (y2 - y1) * (xs - x1)
+        on_edge |= (
+            (np.abs(cross) < 1e-6)
+            & (xs >= min(x1, x2)) & (xs <= max(x1, x2))
+            & (ys >= min(y1, y2)) & (ys <= max(y1, y2))
+        )
+    return inside | on_edge
+
+
+class SlotLayout:
+    def __init__(self, areas, frame_size=(1020, 500), line_spacing=0.35, draw_line_spacing=0.3):
+        self.names = list(areas)
+        self.frame_size = frame_size
+        self.polygons = np.array([areas[name] for name in self.names], np.int32).reshape(len(self.names), 4, 2)
+        self.bboxes = np.concatenate([self.polygons.min(axis=1), self.polygons.max(axis=1)], axis=1)
+        self.label_centers = [
+            (int(np.mean(polygon[:, 0])), int(np.mean(polygon[:, 1])) - 10) for polygon in self.polygons
+        ]
+        self.lanes = lane_lines(self.polygons, line_spacing)
+
+        top_x, bottom_x, top_y, bottom_y = lane_lines(self.polygons, draw_line_spacing)
+        self.draw_lines = [
+            [((int(top_x[slot, side]), int(top_y[slot])), (int(bottom_x[slot, side]), int(bottom_y[slot]))) for side in range(2)]
+            for slot in range(len(self.names))
+        ]
+
+        self.slot_mask, self.lane_mask = self._rasterize()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _rasterize(self):
+        width, height = self.frame_size
+        slot_mask = np.zeros((height, width), np.int16)
+        # Digambar terbalik supaya area pertama menang saat poligon bersinggungan
+        for slot in reversed(range(len(self.names))):
+            x1, y1 = np.maximum(self.bboxes[slot, :2], 0)
+            x2, y2 = np.minimum(self.bboxes[slot, 2:], (width - 1, height - 1))
+            ys, xs = np.mgrid[y1:y2 + 1, x1:x2 + 1]
+            inside = inside_polygon(xs, ys, self.polygons[slot])
+            slot_mask[ys[inside], xs[inside]] = slot + 1
+
+        lane_mask = np.zeros((height, width), bool)
+        ys, xs = np.nonzero(slot_mask)
+        slots = slot_mask[ys, xs] - 1
+        top_x, bottom_x, top_y, bottom_y = self.lanes
+        ratio = (ys - top_y[slots]) / (bottom_y[slots] - top_y[slots])
+        left_x = top_x[slots, 0] + ratio * (bottom_x[slots, 0] - top_x[slots, 0])
+        right_x = top_x[slots, 1] + ratio * (bottom_x[slots, 1] - top_x[slots, 1])
+        lane_mask[ys, xs] = (left_x <= xs) & (xs <= right_x)
+        return slot_mask, lane_mask
+
+    def regions(self, margin=60, tiles=1, overlap=0.2):
+        width, height = self.frame_size
+        x0, y0 = np.maximum(self.bboxes[:, :2].min(axis=0) - margin, 0)
+        x1, y1 = np.minimum(self.bboxes[:, 2:].max(axis=0) + margin + 1, (width, height))
+        tile_width = (x1 - x0) / (tiles - (tiles - 1) * overlap)
+        step = tile_width * (1 - overlap)
+        return [
+            (int(x0 + tile * step), int(y0), int(min(x1, x0 + tile * step + tile_width)), int(y1))
+            for tile in range(tiles)
+        ]
+
+    def locate(self, points):
+        slots = np.full(len(points), -1, np.int32)
+        is_violation = np.ones(len(points), bool)
+        if len(points) == 0:
+            return slots, is_violation
+
+        width, height = self.frame_size
+        xs = points[:, 0]
+        ys = points[:, 1]
+        in_frame = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        xs = xs[in_frame]
+        ys = ys[in_frame]
+        slots[in_frame] = self.slot_mask[ys, xs] - 1
+        is_violation[in_frame] = ~self.lane_mask[ys, xs]
+        return slots, is_violation
@@ -0,0 +1,37 @@
+import numpy as np
+
+SLOT_STATES = ("empty", "occupied", "violation")
+
+
+def observed_states(area_counts, violations):
+    return np.where(violations > 0, 2, np.where(area_counts > 0, 1, 0)).astype(np.int8)
+
+
+class SlotStateMachine:
+    def __init__(self, slot_count, enter_frames=3, leave_frames=5):
+        self.enter_frames = max(1, enter_frames)
+        self.leave_frames = max(1, leave_frames)
+        self.state = np.zeros(slot_count, np.int8)
+        self.candidate = np.zeros(slot_count, np.int8)
+        self.streak = np.zeros(slot_count, np.int32)
+        self._started = False
+
+    def update(self, observed):
+        if not self._started:
+            # Frame pertama langsung dipakai, tidak perlu menunggu dari status kosong
+            self._started = True
+            changed = observed != self.state
+            self.state[:] = observed
+            return changed
+
+        # Status baru harus terlihat beberapa frame berturut-turut sebelum dipakai:
+        # enter_frames untuk naik (kosong -> terisi -> melanggar), leave_frames untuk turun
+        differs = observed != self.state
+        repeated = differs & (observed == self.candidate)
+        self.streak = np.where(repeated, self.streak + 1, differs.astype(np.int32))
+        self.candidate = np.where(differs, observed, self.state)
+        required = np.where(observed > self.state, self.enter_frames, self.leave_frames)
+        changed = differs & (self.streak >= required)
+        self.state[changed] = observed[changed]
+        self.streak[changed] = 0
+        return changed
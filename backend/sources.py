@@ -0,0 +1,152 @@
+import collections
+import threading
+import time
+from datetime import datetime
+import cv2
+from timing import NullTimer
+
+LIVE_PREFIXES = ("rtsp://", "rtmp://", "http://", "https://")
+
+
+def is_live(source):
+    return isinstance(source, int) or str(source).isdigit() or str(source).lower().startswith(LIVE_PREFIXES)
+
+
+class FrameSource:
+    def __init__(self, source, prepare=None, buffer_size=4, latest_only=None, loop=False, reconnect_delay=1, max_reconnect_delay=30, timeout_ms=5000, timer=None):
+        self.source = source
+        self.prepare = prepare
+        self.live = is_live(source)
+        # Kamera live: frame terbaru yang menang; rekaman: tidak ada frame yang dibuang
+        self.latest_only = self.live if latest_only is None else latest_only
+        self.loop = loop
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.timeout_ms = timeout_ms
+        self.timer = timer if timer is not None else NullTimer()
+        self.state = "connecting"
+        self.reconnects = 0
+        self.loops = 0
+        self.frames_dropped = 0
+        self.last_frame_time = None
+        self._frame_times = collections.deque(maxlen=30)
+        self._frames = collections.deque(maxlen=max(1, buffer_size))
+        self._condition = threading.Condition()
+        self._finished = False
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=f"decode-{source}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    @property
+    def finished(self):
+        with self._condition:
+            return (self._finished or self._stopped) and not self._frames
+
+    def health(self):
+        with self._condition:
+            times = self._frame_times
+            elapsed = times[-1] - times[0] if len(times) > 1 else 0
+            return {
+                "state": self.state,
+                "live": self.live,
+                "fps": round((len(times) - 1) / elapsed, 1) if elapsed > 0 else 0.0,
+                "last_frame_time": datetime.fromtimestamp(self.last_frame_time).isoformat() if self.last_frame_time else None,
+                "reconnects": self.reconnects,
+                "loops": self.loops,
+                "frames_dropped": self.frames_dropped,
+            }
+
+    def _open(self):
+        source = int(self.source) if str(self.source).isdigit() else self.source
+        if self.live:
+            # Tanpa batas waktu, stream RTSP yang macet bisa menahan cap.read() sangat lama
+            return cv2.VideoCapture(source, cv2.CAP_ANY, [
+                cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, self.timeout_ms,
+                cv2.CAP_PROP_READ_TIMEOUT_MSEC, self.timeout_ms,
+            ])
+        return cv2.VideoCapture(source)
+
+    def _run(self):
+        delay = self.reconnect_delay
+        try:
+            while True:
+                cap = self._open()
+                try:
+                    frames_read = self._read_frames(cap)
+                finally:
+                    cap.release()
+                with self._condition:
+                    if self._stopped:
+                        break
+                if not self.live:
+                    if not self.loop or frames_read == 0:
+                        break
+                    self.loops += 1
+                    continue
+
+                if frames_read:
+                    delay = self.reconnect_delay
+                print(f"Sumber {self.source} terputus, mencoba lagi dalam {delay} detik")
+                with self._condition:
+                    self.state = "reconnecting"
+                    self._frame_times.clear()
+                    if self._condition.wait_for(lambda: self._stopped, delay):
+                        break
+                delay = min(delay * 2, self.max_reconnect_delay)
+                self.reconnects += 1
+        finally:
+            with self._condition:
+                self.state = "stopped" if self._stopped else "finished"
+                self._finished = True
+                self._condition.notify_all()
+
+    def _read_frames(self, cap):
+        frames_read = 0
+        while True:
+            started = time.perf_counter()
+            ret, frame = cap.read()
+            if not ret:
+                return frames_read
+            frames_read += 1
+            decoded = time.perf_counter()
+            self.timer.record("decode", decoded - started)
+            if self.prepare is not None:
+                frame = self.prepare(frame)
+                self.timer.record("resize", time.perf_counter() - decoded)
+            with self._condition:
+                while not self.latest_only and len(self._frames) == self._frames.maxlen and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return frames_read
+                if len(self._frames) == self._frames.maxlen:
+                    self.frames_dropped += 1
+                self._frames.append(frame)
+                self.state = "running"
+                self.last_frame_time = time.time()
+                self._frame_times.append(time.monotonic())
+                self._condition.notify_all()
+
+    def read(self, timeout=None):
+        with self._condition:
+            if not self._frames and not self._finished and not self._stopped:
+                self._condition.wait(timeout)
+            if not self._frames:
+                return None
+            if self.latest_only:
+                # Backlog decoder dibuang supaya latensi kamera live tidak terus bertambah
+                frame = self._frames.pop()
+                self.frames_dropped += len(self._frames)
+                self._frames.clear()
+            else:
+                frame = self._frames.popleft()
+            self._condition.notify_all()
+            return frame
@@ -0,0 +1,83 @@
+import cv2
+import json
+
+
+def encode_tiers(frame, tiers, viewers):
+    # Setiap tingkat kualitas hanya di-encode sekali per frame, dan hanya jika ada penonton
+    frames = {}
+    height, width = frame.shape[:2]
+    for index, tier in enumerate(tiers):
+        if viewers[index] <= 0:
+            continue
+        image = frame
+        if tier["width"] < width:
+            image = cv2.resize(frame, (tier["width"], round(height * tier["width"] / width)), interpolation=cv2.INTER_AREA)
+        ret, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, tier["quality"]])
+        if ret:
+            frames[tier["name"]] = buffer.tobytes()
+    return frames
+
+
+def choose_tier(tiers, default_tier, name=None, max_width=None):
+    if name is not None:
+        for tier in tiers:
+            if tier["name"] == name:
+                return tier["name"]
+        raise ValueError(f"Unknown stream tier: {name}")
+    if max_width is not None:
+        fitting = [tier for tier in tiers if tier["width"] <= max_width]
+        if fitting:
+            return max(fitting, key=lambda tier: tier["width"])["name"]
+        return min(tiers, key=lambda tier: tier["width"])["name"]
+    return default_tier
+
+
+def parse_stream_args(args, stream):
+    max_width = int(args['width']) if 'width' in args else None
+    tier = choose_tier(stream["tiers"], stream["default_tier"], args.get('tier'), max_width)
+    max_fps = min(float(args.get('fps', stream["max_fps"])), stream["max_fps"])
+    if max_fps <= 0:
+        raise ValueError("fps must be positive")
+    return tier, max_fps
+
+
+def multipart_chunk(frame):
+    return (b'--frame\r\n'
+        b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+
+
+def status_counts(status):
+    return {key: status[key] for key in ("empty_slots", "occupied_slots", "violation_slots")}
+
+
+def total_counts(statuses):
+    totals = {"empty_slots": 0, "occupied_slots": 0, "violation_slots": 0}
+    for camera_status in statuses:
+        for key in totals:
+            totals[key] += camera_status[key]
+    return totals
+
+
+class StatusDeltas:
+    def __init__(self, camera_id=None):
+        self.camera_id = camera_id
+        self.previous = {}
+
+    def event(self, statuses):
+        changes = {}
+        for camera, camera_status in statuses.items():
+            if self.camera_id is not None and camera != self.camera_id:
+                continue
+            known = self.previous.get(camera, {})
+            delta = {slot: state for slot, state in camera_status["slots"].items() if known.get(slot) != state}
+            self.previous[camera] = camera_status["slots"]
+            if delta:
+                changes[camera] = {**status_counts(camera_status), "slots": delta}
+
+        if not changes:
+            return None
+        if self.camera_id is not None:
+            event = changes[self.camera_id]
+        else:
+            event = {**total_counts(statuses.values()), "cameras": changes}
+        return f"data: {json.dumps(event, separators=(',', ':'))}\n\n"
@@ -1,10 +1,12 @@
 import cv2
-import pandas as pd
 import numpy as np
-from ultralytics import YOLO
 import time
+from backends import load_detector
+from config import load_config
+from postprocess import class_ids_for, filter_boxes
 
-model=YOLO('yolov8s.pt')
+# Detektor mengikuti backend inferensi di cameras.json (ultralytics atau onnxruntime)
+detector=load_detector(load_config())
 
 
 def RGB(event, x, y, flags, param):
@@ -21,6 +23,7 @@ cap=cv2.VideoCapture('parking1.mp4')
 my_file = open("coco.txt", "r")
 data = my_file.read()
 class_list = data.split("\n")
+car_class_ids=class_ids_for(class_list,["car"])
    
 
 area1=[(52,364),(30,417),(73,412),(88,369)]
@@ -57,11 +60,8 @@ while True:
     time.sleep(1)
     frame=cv2.resize(frame,(1020,500))
 
-    results=model.predict(frame)
- #   print(results)
-    a=results[0].boxes.data
-    px=pd.DataFrame(a).astype("float")
-#    print(px)
+    detections=detector.predict([frame],classes=car_class_ids.tolist())[0]
+    indices,boxes,centroids=filter_boxes(detections,car_class_ids)
     list1=[]
     list2=[]
     list3=[]
@@ -75,84 +75,74 @@ while True:
     list11=[]
     list12=[]
     
-    for index,row in px.iterrows():
-#        print(row)
- 
-        x1=int(row[0])
-        y1=int(row[1])
-        x2=int(row[2])
-        y2=int(row[3])
-        d=int(row[5])
-        c=class_list[d]
-        if 'car' in c:
-            cx=int(x1+x2)//2
-            cy=int(y1+y2)//2
-
-            results1=cv2.pointPolygonTest(np.array(area1,np.int32),((cx,cy)),False)
-            if results1>=0:
-               cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
-               cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
-               list1.append(c)
-               cv2.putText(frame,str(c),(x1,y1),cv2.FONT_HERSHEY_COMPLEX,0.5,(255,255,255),1)
-            
-            results2=cv2.pointPolygonTest(np.array(area2,np.int32),((cx,cy)),False)
-            if results2>=0:
-               cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
-               cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
-               list2.append(c)
-            
-            results3=cv2.pointPolygonTest(np.array(area3,np.int32),((cx,cy)),False)
-            if results3>=0:
-               cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
-               cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
-               list3.append(c)   
-            results4=cv2.pointPolygonTest(np.array(area4,np.int32),((cx,cy)),False)
-            if results4>=0:
-               cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
-               cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
-               list4.append(c)  
-            results5=cv2.pointPolygonTest(np.array(area5,np.int32),((cx,cy)),False)
-            if results5>=0:
-               cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
-               cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
-               list5.append(c)  
-            results6=cv2.pointPolygonTest(np.array(area6,np.int32),((cx,cy)),False)
-            if results6>=0:
-               cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
-               cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
-               list6.append(c)  
-            results7=cv2.pointPolygonTest(np.array(area7,np.int32),((cx,cy)),False)
-            if results7>=0:
-               cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
-               cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
-               list7.append(c)   
-            results8=cv2.pointPolygonTest(np.array(area8,np.int32),((cx,cy)),False)
-            if results8>=0:
-               cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
-               cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
-               list8.append(c)  
-            results9=cv2.pointPolygonTest(np.array(area9,np.int32),((cx,cy)),False)
-            if results9>=0:
-               cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
-               cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
-               list9.append(c)  
-            results10=cv2.pointPolygonTest(np.array(area10,np.int32),((cx,cy)),False)
-            if results10>=0:
-                cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
-                cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
-                list10.append(c)     
-            results11=cv2.pointPolygonTest(np.array(area11,np.int32),((cx,cy)),False)
-            if results11>=0:
-               cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
-               cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
-               list11.append(c)    
-            results12=cv2.pointPolygonTest(np.array(area12,np.int32),((cx,cy)),False)
-            if results12>=0:
-               cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
-               cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
-               list12.append(c)
-              
-            
+    for index,(x1,y1,x2,y2),(cx,cy) in zip(indices.tolist(),boxes.tolist(),centroids.tolist()):
+        c=class_list[int(detections[index,5])]
+
+        results1=cv2.pointPolygonTest(np.array(area1,np.int32),((cx,cy)),False)
+        if results1>=0:
+           cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
+           cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
+           list1.append(c)
+           cv2.putText(frame,str(c),(x1,y1),cv2.FONT_HERSHEY_COMPLEX,0.5,(255,255,255),1)
+        
+        results2=cv2.pointPolygonTest(np.array(area2,np.int32),((cx,cy)),False)
+        if results2>=0:
+           cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
+           cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
+           list2.append(c)
+        
+        results3=cv2.pointPolygonTest(np.array(area3,np.int32),((cx,cy)),False)
+        if results3>=0:
+           cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
+           cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
+           list3.append(c)   
+        results4=cv2.pointPolygonTest(np.array(area4,np.int32),((cx,cy)),False)
+        if results4>=0:
+           cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
+           cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
+           list4.append(c)  
+        results5=cv2.pointPolygonTest(np.array(area5,np.int32),((cx,cy)),False)
+        if results5>=0:
+           cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
+           cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
+           list5.append(c)  
+        results6=cv2.pointPolygonTest(np.array(area6,np.int32),((cx,cy)),False)
+        if results6>=0:
+           cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
+           cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
+           list6.append(c)  
+        results7=cv2.pointPolygonTest(np.array(area7,np.int32),((cx,cy)),False)
+        if results7>=0:
+           cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
+           cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
+           list7.append(c)   
+        results8=cv2.pointPolygonTest(np.array(area8,np.int32),((cx,cy)),False)
+        if results8>=0:
+           cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
+           cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
+           list8.append(c)  
+        results9=cv2.pointPolygonTest(np.array(area9,np.int32),((cx,cy)),False)
+        if results9>=0:
+           cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
+           cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
+           list9.append(c)  
+        results10=cv2.pointPolygonTest(np.array(area10,np.int32),((cx,cy)),False)
+        if results10>=0:
+            cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
+            cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
+            list10.append(c)     
+        results11=cv2.pointPolygonTest(np.array(area11,np.int32),((cx,cy)),False)
+        if results11>=0:
+           cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
+           cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
+           list11.append(c)    
+        results12=cv2.pointPolygonTest(np.array(area12,np.int32),((cx,cy)),False)
+        if results12>=0:
+           cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
+           cv2.circle(frame,(cx,cy),3,(0,0,255),-1)
+           list12.append(c)
+          
+        
     a1=(len(list1))
     a2=(len(list2))       
     a3=(len(list3))    
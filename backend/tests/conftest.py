@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modul backend berupa file datar yang biasanya dijalankan dari direktori backend
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
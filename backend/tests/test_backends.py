@@ -0,0 +1,26 @@
+import numpy as np
+from backends import decode_predictions
+
+CAR, TRUCK = 2, 7
+
+
+def anchor(box, scores):
+    column = np.zeros(4 + 80, np.float32)
+    column[:4] = box
+    for class_id, score in scores.items():
+        column[4 + class_id] = score
+    return column
+
+
+def test_class_filter_applies_after_best_class():
+    output = np.stack([
+        anchor((100, 100, 40, 20), {TRUCK: 0.95, CAR: 0.5}),
+        anchor((300, 100, 40, 20), {CAR: 0.8}),
+    ], axis=1)
+
+    detections = decode_predictions(output, conf=0.25, iou=0.7, classes=(CAR,))
+    assert detections[:, 5].tolist() == [CAR]
+    assert detections[:, 4].tolist() == [np.float32(0.8)]
+
+    everything = decode_predictions(output, conf=0.25, iou=0.7)
+    assert sorted(everything[:, 5].tolist()) == [CAR, TRUCK]
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+import numpy as np
+from captures import CaptureWriter
+from violation_store import ViolationStore
+
+IMAGE = np.zeros((8, 8, 3), np.uint8)
+
+
+def test_index_rows_written_after_images(tmp_path):
+    store = ViolationStore(str(tmp_path / "violations.db"))
+    writer = CaptureWriter(str(tmp_path), workers=2, store=store)
+    start = datetime(2026, 1, 1, 8, 0, 0)
+    end = start + timedelta(minutes=5)
+
+    # Episode selesai sebelum gambar pertamanya ditulis, lalu ada gambar susulan setelah selesai
+    writer.end_episode("cam", 1, start, end)
+    writer.submit("first.jpg", IMAGE, ("cam", "a", 1, start))
+    writer.close()
+    writer = CaptureWriter(str(tmp_path), workers=1, store=store)
+    writer.submit("refresh.jpg", IMAGE, ("cam", "a", 1, start))
+    writer.close()
+
+    rows, _ = store.query()
+    assert sorted(row["image"] for row in rows) == ["first.jpg", "refresh.jpg"]
+    assert all(row["end_time"] == end.timestamp() for row in rows)
+
+
+def test_dropped_image_leaves_no_index_row(tmp_path):
+    store = ViolationStore(str(tmp_path / "violations.db"))
+    writer = CaptureWriter(str(tmp_path), workers=1, max_queue=0, store=store)
+    assert not writer.submit("dropped.jpg", IMAGE, ("cam", "a", 1, datetime(2026, 1, 1)))
+    writer.close()
+    assert store.query()[0] == []
+    assert writer.stats()["dropped"] == 1
+
+
+def test_encode_failure_counts_as_failed(tmp_path):
+    store = ViolationStore(str(tmp_path / "violations.db"))
+    writer = CaptureWriter(str(tmp_path), workers=1, store=store)
+    writer.submit("empty.jpg", IMAGE[:0], ("cam", "a", 1, datetime(2026, 1, 1)))
+    writer.close()
+    assert writer.stats()["failed"] == 1
+    assert writer.stats()["written"] == 0
+    assert store.query()[0] == []
@@ -0,0 +1,20 @@
+import pytest
+from layouts import validate_areas
+
+SLOT = [[0.35, 0.3], [0.35, 0.6], [0.5, 0.6], [0.5, 0.3]]
+
+
+def test_accepts_top_left_bottom_left_bottom_right_top_right():
+    assert validate_areas({"a": SLOT})["a"] == [tuple(point) for point in SLOT]
+
+
+@pytest.mark.parametrize("points", [
+    # Persegi yang sama tetapi searah jarum jam dari kiri atas
+    [[0.35, 0.3], [0.5, 0.3], [0.5, 0.6], [0.35, 0.6]],
+    # Semua titik segaris
+    [[0.1, 0.1], [0.2, 0.2], [0.3, 0.3], [0.4, 0.4]],
+    [[0.5, 0.5]] * 4,
+])
+def test_rejects_misordered_or_flat_slots(points):
+    with pytest.raises(ValueError, match="top-left, bottom-left, bottom-right, top-right"):
+        validate_areas({"a": points})
@@ -0,0 +1,26 @@
+import numpy as np
+import occupancy_store
+from occupancy_store import OccupancyRecorder, OccupancyStore
+
+
+def test_recorder_writes_only_on_flush(tmp_path, monkeypatch):
+    clock = [1_700_000_000.0]
+    monkeypatch.setattr(occupancy_store.time, "time", lambda: clock[0])
+    store = OccupancyStore(str(tmp_path / "occupancy.db"))
+    recorder = OccupancyRecorder(store, "cam", ["a", "b"], flush_seconds=3600)
+
+    previous = np.zeros(2, np.int8)
+    for states in ([0, 0], [1, 0], [1, 2], [0, 2]):
+        states = np.array(states, np.int8)
+        recorder.update(states, states != previous)
+        previous = states
+        clock[0] += 600
+    # Selama belum flush tidak ada yang dikirim ke database
+    assert store.rollups(0, 2e9, "hour", "cam")[1] == []
+
+    recorder.flush()
+    store.close()
+    _, slots = store.rollups(0, 2e9, "hour", "cam")
+    seconds = {row["slot"]: (row["empty_seconds"], row["occupied_seconds"], row["violation_seconds"]) for row in slots}
+    assert seconds == {"a": (1200.0, 1200.0, 0.0), "b": (1200.0, 0.0, 1200.0)}
+    assert store.dwell_times(0, 2e9, "cam") == [1200.0]
@@ -0,0 +1,62 @@
+import numpy as np
+from pipeline import CameraPipeline
+
+# Satu mobil diam dengan centroid (440, 230) pada frame 1020x500
+CAR = np.array([[400, 200, 480, 260, 0.9, 0]], np.float32)
+LEFT_SLOT = [[0.0, 0.3], [0.0, 0.6], [0.2, 0.6], [0.2, 0.3]]
+CAR_SLOT = [[0.35, 0.3], [0.35, 0.6], [0.5, 0.6], [0.5, 0.3]]
+
+
+def frame(width=1020, height=500):
+    return np.zeros((height, width, 3), np.uint8)
+
+
+def test_set_layout_relocates_parked_cars():
+    pipeline = CameraPipeline("cam", {"left": LEFT_SLOT}, ["car"], None)
+    pipeline.fit(frame())
+    for _ in range(3):
+        _, states = pipeline.update(CAR)
+    assert states.tolist() == [0]
+
+    pipeline.set_layout({"car": CAR_SLOT})
+    for _ in range(10):
+        tracks, states = pipeline.update(CAR)
+        assert states.tolist() == [1]
+        assert [track.slot for track in tracks] == [0]
+
+
+def test_resolution_change_relocates_parked_cars():
+    pipeline = CameraPipeline("cam", {"car": CAR_SLOT}, ["car"], None, frame={"width": None, "height": None})
+    pipeline.fit(frame())
+    for _ in range(3):
+        _, states = pipeline.update(CAR)
+    assert states.tolist() == [1]
+
+    # Sumber tersambung ulang dengan resolusi sedikit berbeda, mobil bergeser kurang dari stable_distance
+    pipeline.fit(frame(1024, 502))
+    assert pipeline.layout.frame_size == (1024, 502)
+    for _ in range(10):
+        tracks, states = pipeline.update(CAR)
+        assert states.tolist() == [1]
+        assert [track.slot for track in tracks] == [0]
+
+
+def test_empty_capture_crop_is_retried():
+    class Writer:
+        def __init__(self):
+            self.submitted = []
+
+        def submit(self, filename, image, episode=None):
+            self.submitted.append(image.shape)
+            return True
+
+    writer = Writer()
+    pipeline = CameraPipeline("cam", {"car": CAR_SLOT}, ["car"], writer, captures={"dwell_seconds": 0})
+    pipeline.fit(frame())
+    # Mobil di luar slot (pelanggaran) yang kotaknya belum punya lebar
+    flat = np.array([[900, 400, 900, 460, 0.9, 0]], np.float32)
+    pipeline.annotate(frame(), flat, draw=False)
+    pipeline.annotate(frame(), flat, draw=False)
+    track = pipeline.tracker.tracks[0]
+    assert writer.submitted == []
+    assert track.violation_since is not None and track.captured_at is None
@@ -0,0 +1,12 @@
+import pytest
+from violation_store import parse_cursor
+
+
+def test_parse_cursor():
+    assert parse_cursor("1767254400.5:42") == (1767254400.5, 42)
+
+
+@pytest.mark.parametrize("cursor", ["abc", "1.0:x", "1:2:3", ""])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError, match="^Invalid cursor$"):
+        parse_cursor(cursor)
@@ -0,0 +1,31 @@
+import collections
+import time
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples = collections.defaultdict(list)
+        self._last = time.perf_counter()
+
+    def start(self):
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        # Waktu sejak lap sebelumnya dicatat sebagai durasi tahap ini
+        now = time.perf_counter()
+        self.record(stage, now - self._last)
+        self._last = now
+
+    def record(self, stage, seconds):
+        self.samples[stage].append(seconds)
+
+
+class NullTimer:
+    def start(self):
+        pass
+
+    def lap(self, stage):
+        pass
+
+    def record(self, stage, seconds):
+        pass
@@ -0,0 +1,79 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+
+def iou_matrix(boxes_a, boxes_b):
+    boxes_a = boxes_a.astype(np.float32)
+    boxes_b = boxes_b.astype(np.float32)
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return intersection / np.maximum(union, 1e-6)
+
+
+class Track:
+    def __init__(self, track_id, box):
+        self.id = track_id
+        self.box = tuple(box)
+        self.raw_box = self.box
+        self.centroid = ((box[0] + box[2]) // 2, (box[1] + box[3]) // 2)
+        self.hits = 1
+        self.misses = 0
+        self.moved = True
+        self.slot = -1
+        self.is_violation = True
+        self.violation_since = None
+        self.captured_at = None
+
+    def update(self, box, stable_distance):
+        box = tuple(box)
+        cx, cy = (box[0] + box[2]) // 2, (box[1] + box[3]) // 2
+        self.raw_box = box
+        self.hits += 1
+        self.misses = 0
+        # Posisi lama dipertahankan selama mobil hanya bergeser sedikit (jitter deteksi)
+        self.moved = abs(cx - self.centroid[0]) >= stable_distance or abs(cy - self.centroid[1]) >= stable_distance
+        if self.moved:
+            self.box = box
+            self.centroid = (cx, cy)
+
+
+class Tracker:
+    def __init__(self, iou_threshold=0.3, max_misses=15, stable_distance=10):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.stable_distance = stable_distance
+        self.tracks = []
+        self.expired = []
+        self._next_id = 0
+
+    def update(self, boxes):
+        rows = cols = np.empty(0, np.int64)
+        if self.tracks and len(boxes):
+            ious = iou_matrix(np.array([track.raw_box for track in self.tracks]), boxes)
+            rows, cols = linear_sum_assignment(-ious)
+            keep = ious[rows, cols] >= self.iou_threshold
+            rows, cols = rows[keep], cols[keep]
+
+        matched_tracks = set(rows.tolist())
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            self.tracks[row].update(boxes[col].tolist(), self.stable_distance)
+
+        for row, track in enumerate(self.tracks):
+            if row not in matched_tracks:
+                track.misses += 1
+        self.expired = [track for track in self.tracks if track.misses > self.max_misses]
+        self.tracks = [track for track in self.tracks if track.misses <= self.max_misses]
+
+        matched_boxes = set(cols.tolist())
+        for col, box in enumerate(boxes.tolist()):
+            if col not in matched_boxes:
+                self.tracks.append(Track(self._next_id, box))
+                self._next_id += 1
+
+        return [track for track in self.tracks if track.misses == 0]
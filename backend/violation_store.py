@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS violations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    camera TEXT NOT NULL,
+    slot TEXT,
+    track_id INTEGER,
+    start_time REAL NOT NULL,
+    end_time REAL,
+    image TEXT NOT NULL UNIQUE
+);
+CREATE INDEX IF NOT EXISTS violations_time ON violations (start_time, id);
+CREATE INDEX IF NOT EXISTS violations_camera_slot ON violations (camera, slot, start_time, id);
+"""
+
+
+def parse_cursor(cursor):
+    try:
+        start_time, violation_id = cursor.split(":")
+        return float(start_time), int(violation_id)
+    except ValueError:
+        raise ValueError("Invalid cursor") from None
+
+
+class ViolationStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(SCHEMA)
+
+    def record(self, camera, slot, track_id, start_time, image, end_time=None):
+        # Gambar susulan dari episode yang sudah selesai ikut memakai waktu akhir episodenya
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO violations (camera, slot, track_id, start_time, image, end_time) VALUES (?, ?, ?, ?, ?, "
+                "COALESCE(?, (SELECT MAX(end_time) FROM violations WHERE camera = ? AND track_id = ? AND start_time = ?)))",
+                (
+                    camera, slot, track_id, start_time.timestamp(), image,
+                    end_time.timestamp() if end_time is not None else None, camera, track_id, start_time.timestamp(),
+                ),
+            )
+            return cursor.lastrowid
+
+    def end_episode(self, camera, track_id, start_time, end_time):
+        with self._lock, self._connection:
+            return self._connection.execute(
+                "UPDATE violations SET end_time = ? WHERE camera = ? AND track_id = ? AND start_time = ? AND end_time IS NULL",
+                (end_time.timestamp(), camera, track_id, start_time.timestamp()),
+            ).rowcount > 0
+
+    def query(self, limit=100, cursor=None, start=None, end=None, camera=None, slot=None):
+        clauses = []
+        params = []
+        if camera is not None:
+            clauses.append("camera = ?")
+            params.append(camera)
+        if slot is not None:
+            clauses.append("slot = ?")
+            params.append(slot)
+        if start is not None:
+            clauses.append("start_time >= ?")
+            params.append(start.timestamp())
+        if end is not None:
+            clauses.append("start_time < ?")
+            params.append(end.timestamp())
+        if cursor is not None:
+            clauses.append("(start_time, id) < (?, ?)")
+            params.extend(parse_cursor(cursor))
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT * FROM violations {where} ORDER BY start_time DESC, id DESC LIMIT ?",
+                params + [limit + 1],
+            ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = f"{rows[-1]['start_time']!r}:{rows[-1]['id']}"
+        return [dict(row) for row in rows], next_cursor
+
+    def delete(self, image):
+        with self._lock, self._connection:
+            return self._connection.execute("DELETE FROM violations WHERE image = ?", (image,)).rowcount > 0
+
+    def delete_all(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM violations")
+
+    def backfill(self, directory, default_camera):
+        # Mengindeks gambar lama yang disimpan sebelum ada indeks SQLite
+        with self._lock:
+            known = {row[0] for row in self._connection.execute("SELECT image FROM violations")}
+        for filename in os.listdir(directory):
+            if not filename.startswith('pelanggaran_') or filename in known:
+                continue
+            parts = filename.replace('.jpg', '').split('_')
+            try:
+                timestamp = datetime.strptime('_'.join(parts[2:]), '%Y%m%d_%H%M%S')
+            except ValueError:
+                continue
+            camera, _, track_id = parts[1].rpartition('-')
+            self.record(camera or default_camera, None, int(track_id) if track_id.isdigit() else None, timestamp, filename)
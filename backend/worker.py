@@ -0,0 +1,381 @@
+import collections
+import contextlib
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+METRICS_INTERVAL = 1.0
+
+
+class FrameBuffer:
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._frames = {}
+        self._status = {
+            "empty_slots": 0,
+            "occupied_slots": 0,
+            "violation_slots": 0,
+        }
+        self._sequence = 0
+        self._closed = False
+        self._listeners = []
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def publish(self, frames, status):
+        with self._condition:
+            self._frames = frames
+            self._status = status
+            self._sequence += 1
+            self._condition.notify_all()
+        for callback in self._listeners:
+            callback()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for callback in self._listeners:
+            callback()
+
+    @property
+    def closed(self):
+        with self._condition:
+            return self._closed
+
+    def latest(self, last_sequence, tier):
+        with self._condition:
+            if self._sequence != last_sequence and tier in self._frames:
+                return self._sequence, self._frames[tier]
+            return self._sequence, None
+
+    def update_status(self, status):
+        with self._condition:
+            self._status = {**self._status, **status}
+
+    def status(self):
+        with self._condition:
+            return dict(self._status)
+
+    def wait_frame(self, last_sequence, tier, timeout=1.0):
+        # Klien yang lambat langsung mendapat frame terbaru, frame di antaranya dilewati
+        with self._condition:
+            while not self._closed:
+                if self._sequence != last_sequence:
+                    if tier in self._frames:
+                        return self._sequence, self._frames[tier]
+                    last_sequence = self._sequence
+                if not self._condition.wait(timeout):
+                    break
+            return last_sequence, None
+
+
+class StatusHub:
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._statuses = {}
+        self._version = 0
+        self._listeners = []
+        self._subscribers = 0
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    @contextlib.contextmanager
+    def subscribe(self):
+        with self._condition:
+            self._subscribers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._subscribers -= 1
+
+    def subscriber_count(self):
+        with self._condition:
+            return self._subscribers
+
+    def update(self, camera_id, status):
+        with self._condition:
+            previous = self._statuses.get(camera_id)
+            self._statuses[camera_id] = status
+            # Pelanggan hanya dibangunkan kalau status slot benar-benar berubah
+            changed = previous is None or previous.get("slots") != status.get("slots")
+            if changed:
+                self._version += 1
+                self._condition.notify_all()
+        if changed:
+            for callback in self._listeners:
+                callback()
+
+    def snapshot(self, last_version):
+        with self._condition:
+            if self._version == last_version:
+                return last_version, None
+            return self._version, dict(self._statuses)
+
+    def wait(self, last_version, timeout=15):
+        with self._condition:
+            if self._version == last_version:
+                self._condition.wait(timeout)
+            if self._version == last_version:
+                return last_version, None
+            return self._version, dict(self._statuses)
+
+
+def collect_metrics(pipeline, source, scheduler, counters):
+    return {
+        "counters": {
+            **counters,
+            "frames_dropped_decode": source.frames_dropped,
+            "captures_saved": pipeline.captures_saved,
+            "captures_dropped": pipeline.captures_dropped,
+            "source_reconnects": source.reconnects,
+        },
+        "gauges": {
+            "source_fps": source.health()["fps"],
+            "inference_queue_depth": scheduler.pending(),
+            "capture_queue_size": pipeline.capture_writer.stats()["queued"],
+        },
+        "stages": pipeline.timer.snapshot(),
+    }
+
+
+def apply_commands(pipeline, commands):
+    while True:
+        try:
+            command, payload = commands.get_nowait()
+        except queue.Empty:
+            return
+        if command == "layout":
+            pipeline.set_layout(payload["areas"])
+            print(f"Layout kamera {pipeline.camera_id} diganti ke versi {payload['version']}")
+
+
+def run_camera(camera, pipeline, scheduler, results, stop_event, max_inflight, stream, viewers, commands):
+    from sources import FrameSource
+    from streaming import encode_tiers
+
+    # Decode dan resize berjalan di thread sendiri, tumpang tindih dengan inferensi
+    source = FrameSource(camera["source"], pipeline.prepare, timer=pipeline.timer, **camera["decode"]).start()
+    timer = pipeline.timer
+    counters = {"frames_processed": 0, "frames_detected": 0, "frames_dropped_queue": 0}
+    metrics_due = time.monotonic()
+    pending = collections.deque()
+    try:
+        while not stop_event.is_set():
+            apply_commands(pipeline, commands)
+            frame = source.read(timeout=0.5)
+            metrics = None
+            # Metrik dikirim kumulatif, jadi snapshot yang terbuang karena antrean penuh tidak menghilangkan data
+            if time.monotonic() >= metrics_due:
+                metrics = collect_metrics(pipeline, source, scheduler, counters)
+                metrics_due = time.monotonic() + METRICS_INTERVAL
+            if frame is None:
+                if source.finished:
+                    break
+                # Kesehatan sumber tetap dilaporkan selama kamera tersambung ulang
+                try:
+                    results.put_nowait((None, {"source": source.health()}, metrics))
+                except queue.Full:
+                    pass
+                continue
+            pipeline.fit(frame)
+            futures = None
+            if pipeline.gate.should_detect(frame):
+                futures = [scheduler.submit(crop, pipeline.profile) for crop in pipeline.crops(frame)]
+                counters["frames_detected"] += 1
+            # Region disimpan bersama frame karena layout bisa diganti selama inferensi masih berjalan
+            pending.append((frame, futures, pipeline.regions))
+            if len(pending) < max_inflight:
+                continue
+            frame, futures, regions = pending.popleft()
+            timer.start()
+            detections = None
+            if futures:
+                batch_results = [future.result() for future in futures]
+                timer.lap("inference")
+                detections = pipeline.merge(batch_results, regions)
+            # Tanpa penonton frame tidak di-encode, jadi anotasinya juga tidak perlu digambar
+            draw = stream["annotate_idle"] or any(count > 0 for count in viewers)
+            frame, status = pipeline.annotate(frame, detections, draw)
+            status["source"] = source.health()
+            frames = encode_tiers(frame, stream["tiers"], viewers)
+            timer.lap("encode")
+            counters["frames_processed"] += 1
+            try:
+                results.put_nowait((frames, status, metrics))
+            except queue.Full:
+                counters["frames_dropped_queue"] += 1
+    finally:
+        source.stop()
+        if pipeline.occupancy is not None:
+            pipeline.occupancy.flush()
+        results.put(None)
+
+
+def run_group(cameras, config, result_queues, viewer_counts, command_queues, stop_event):
+    # Batasi thread per proses supaya proses kamera tidak saling berebut core
+    os.environ["OMP_NUM_THREADS"] = str(config["threads_per_process"])
+    import cv2
+    from backends import load_detector
+    from batching import BatchScheduler
+    from captures import CaptureWriter
+    from metrics import HistogramTimer
+    from occupancy_store import OccupancyRecorder, OccupancyStore
+    from pipeline import CameraPipeline
+    from violation_store import ViolationStore
+
+    cv2.setNumThreads(config["threads_per_process"])
+    with open("coco.txt", "r") as my_file:
+        class_list = my_file.read().split("\n")
+
+    batch = config["batch"]
+    detector = load_detector(config)
+    scheduler = BatchScheduler(detector, batch["max_batch_size"], batch["max_wait_ms"] / 1000)
+    captures = config["captures"]
+    store = ViolationStore(config["violation_db"])
+    occupancy_store = OccupancyStore(config["occupancy_db"])
+    capture_writer = CaptureWriter(config["capture_directory"], captures["workers"], captures["max_queue"], captures["jpeg_quality"], store)
+    threads = []
+    for camera in cameras:
+        pipeline = CameraPipeline(
+            camera["id"], camera["areas"], class_list, capture_writer,
+            camera["gating"], camera["roi"], camera["tracker"], captures, camera["detection"],
+            HistogramTimer(), camera["smoothing"], OccupancyRecorder(occupancy_store, camera["id"], list(camera["areas"])), camera["frame"],
+        )
+        thread = threading.Thread(
+            target=run_camera,
+            args=(
+                camera,
+                pipeline,
+                scheduler,
+                result_queues[camera["id"]],
+                stop_event,
+                batch["max_inflight"],
+                config["stream"],
+                viewer_counts[camera["id"]],
+                command_queues[camera["id"]],
+            ),
+            name=f"camera-{camera['id']}",
+        )
+        thread.start()
+        threads.append(thread)
+
+    for thread in threads:
+        thread.join()
+    scheduler.close()
+    capture_writer.close()
+    occupancy_store.close()
+
+
+class CameraWorker:
+    def __init__(self, camera, context, status_hub, tiers):
+        self.camera_id = camera["id"]
+        self.frame_buffer = FrameBuffer()
+        self.status_hub = status_hub
+        self.results = context.Queue(maxsize=2)
+        self.tier_index = {tier["name"]: index for index, tier in enumerate(tiers)}
+        self.viewers = context.Array("i", len(tiers))
+        self.commands = context.Queue()
+        self.metrics = None
+        self.process = None
+        self._relay = threading.Thread(target=self._relay_results, daemon=True)
+
+    def start(self):
+        self._relay.start()
+
+    def is_alive(self):
+        return self._relay.is_alive()
+
+    @contextlib.contextmanager
+    def subscribe(self, tier):
+        index = self.tier_index[tier]
+        with self.viewers.get_lock():
+            self.viewers[index] += 1
+        try:
+            yield
+        finally:
+            with self.viewers.get_lock():
+                self.viewers[index] -= 1
+
+    def viewer_count(self):
+        with self.viewers.get_lock():
+            return sum(self.viewers)
+
+    def viewers_by_tier(self):
+        with self.viewers.get_lock():
+            return {tier: self.viewers[index] for tier, index in self.tier_index.items()}
+
+    def set_layout(self, layout):
+        self.commands.put(("layout", {"version": layout["version"], "areas": layout["areas"]}))
+
+    def _relay_results(self):
+        try:
+            while True:
+                try:
+                    item = self.results.get(timeout=1)
+                except queue.Empty:
+                    if not self.process.is_alive():
+                        break
+                    continue
+                if item is None:
+                    break
+                frames, status, metrics = item
+                if metrics is not None:
+                    self.metrics = metrics
+                if frames is None:
+                    self.frame_buffer.update_status(status)
+                    continue
+                self.frame_buffer.publish(frames, status)
+                self.status_hub.update(self.camera_id, status)
+        finally:
+            self.frame_buffer.close()
+
+
+class WorkerGroup:
+    def __init__(self, index, cameras, workers, config, context):
+        self.cameras = cameras
+        self._stop_event = context.Event()
+        self.process = context.Process(
+            target=run_group,
+            args=(
+                cameras,
+                config,
+                {camera["id"]: workers[camera["id"]].results for camera in cameras},
+                {camera["id"]: workers[camera["id"]].viewers for camera in cameras},
+                {camera["id"]: workers[camera["id"]].commands for camera in cameras},
+                self._stop_event,
+            ),
+            name=f"camera-group-{index}",
+            daemon=True,
+        )
+        for camera in cameras:
+            workers[camera["id"]].process = self.process
+
+    def start(self):
+        self.process.start()
+
+    def stop(self, timeout=5):
+        self._stop_event.set()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+def start_cameras(config, status_hub):
+    context = multiprocessing.get_context("spawn")
+    cameras = config["cameras"]
+    workers = {camera["id"]: CameraWorker(camera, context, status_hub, config["stream"]["tiers"]) for camera in cameras}
+    groups = [
+        WorkerGroup(index, cameras[index::config["processes"]], workers, config, context)
+        for index in range(min(config["processes"], len(cameras)))
+    ]
+    for group in groups:
+        group.start()
+    for worker in workers.values():
+        worker.start()
+    return workers, groups
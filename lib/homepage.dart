@@ -290,43 +290,88 @@ class _StatusSlotState extends State<StatusSlot> {
   int emptySlots = 0;
   int occupiedSlots = 0;
   int violationSlots = 0;
-  Timer? _timer;
+  Timer? _reconnectTimer;
+  http.Client? _statusClient;
+  StreamSubscription<String>? _statusSubscription;
 
   @override
   void initState() {
     super.initState();
     _fetchStatus();
-    // Set up periodic updates every 2 seconds
-    _timer = Timer.periodic(const Duration(seconds: 2), (timer) {
-      _fetchStatus();
-    });
+    // Status dikirim server hanya saat ada slot yang berubah
+    _listenStatus();
   }
 
   @override
   void dispose() {
-    _timer?.cancel();
+    _reconnectTimer?.cancel();
+    _statusSubscription?.cancel();
+    _statusClient?.close();
     super.dispose();
   }
 
+  void _applyStatus(dynamic data) {
+    setState(() {
+      emptySlots = data['empty_slots'];
+      occupiedSlots = data['occupied_slots'];
+      violationSlots = data['violation_slots'];
+    });
+  }
+
   Future<void> _fetchStatus() async {
     try {
       final response = await http.get(
         Uri.parse('http://192.168.196.46:8080/status'),  // Replace with your backend IP
       );
       
-      if (response.statusCode == 200) {
-        final data = json.decode(response.body);
-        setState(() {
-          emptySlots = data['empty_slots'];
-          occupiedSlots = data['occupied_slots'];
-          violationSlots = data['violation_slots'];
-        });
+      if (response.statusCode == 200 && mounted) {
+        _applyStatus(json.decode(response.body));
       }
     } catch (e) {
       print('Error fetching status: $e');
     }
   }
 
+  Future<void> _listenStatus() async {
+    try {
+      _statusClient = http.Client();
+      final request = http.Request(
+        'GET',
+        Uri.parse('http://192.168.196.46:8080/status/stream'),  // Replace with your backend IP
+      );
+      final response = await _statusClient!.send(request);
+
+      _statusSubscription = response.stream
+          .transform(utf8.decoder)
+          .transform(const LineSplitter())
+          .listen(
+        (line) {
+          if (line.startsWith('data: ') && mounted) {
+            _applyStatus(json.decode(line.substring(6)));
+          }
+        },
+        onDone: _scheduleReconnect,
+        onError: (e) {
+          print('Error listening to status: $e');
+          _scheduleReconnect();
+        },
+        cancelOnError: true,
+      );
+    } catch (e) {
+      print('Error listening to status: $e');
+      _scheduleReconnect();
+    }
+  }
+
+  void _scheduleReconnect() {
+    _statusClient?.close();
+    if (!mounted) return;
+    _reconnectTimer = Timer(const Duration(seconds: 2), () {
+      _fetchStatus();
+      _listenStatus();
+    });
+  }
+
   @override
   Widget build(BuildContext context) {
     return Column(
@@ -12,13 +12,31 @@ class ViolationPage extends StatefulWidget {
 class _ViolationPageState extends State<ViolationPage> {
   List<Map<String, dynamic>> violations = [];
   bool isLoading = true;
+  // Server mengirim pelanggaran per halaman; cursor halaman berikutnya ada di header X-Next-Cursor
+  String? nextCursor;
+  bool isLoadingMore = false;
+  final ScrollController scrollController = ScrollController();
 
   @override
   void initState() {
     super.initState();
+    scrollController.addListener(onScroll);
     fetchViolations();
   }
 
+  @override
+  void dispose() {
+    scrollController.dispose();
+    super.dispose();
+  }
+
+  void onScroll() {
+    if (scrollController.position.pixels >=
+        scrollController.position.maxScrollExtent - 300) {
+      fetchMoreViolations();
+    }
+  }
+
   Future<void> fetchViolations() async {
     try {
       final response =
@@ -27,6 +45,7 @@ class _ViolationPageState extends State<ViolationPage> {
         final List<dynamic> data = json.decode(response.body);
         setState(() {
           violations = data.cast<Map<String, dynamic>>();
+          nextCursor = response.headers['x-next-cursor'];
           isLoading = false;
         });
       }
@@ -38,6 +57,33 @@ class _ViolationPageState extends State<ViolationPage> {
     }
   }
 
+  Future<void> fetchMoreViolations() async {
+    final cursor = nextCursor;
+    if (cursor == null || isLoadingMore) return;
+    setState(() {
+      isLoadingMore = true;
+    });
+    try {
+      final response = await http.get(Uri.parse(
+          'http://192.168.196.46:8080/violations?cursor=${Uri.encodeQueryComponent(cursor)}'));
+      if (response.statusCode == 200 && mounted) {
+        final List<dynamic> data = json.decode(response.body);
+        setState(() {
+          violations.addAll(data.cast<Map<String, dynamic>>());
+          nextCursor = response.headers['x-next-cursor'];
+        });
+      }
+    } catch (e) {
+      print('Error fetching more violations: $e');
+    } finally {
+      if (mounted) {
+        setState(() {
+          isLoadingMore = false;
+        });
+      }
+    }
+  }
+
   Future<void> deleteViolation(String imageName) async {
     try {
       final response = await http.delete(
@@ -68,6 +114,7 @@ class _ViolationPageState extends State<ViolationPage> {
       if (response.statusCode == 200) {
         setState(() {
           violations.clear();
+          nextCursor = null;
         });
         ScaffoldMessenger.of(context).showSnackBar(
           const SnackBar(
@@ -100,6 +147,7 @@ class _ViolationPageState extends State<ViolationPage> {
         child: isLoading
             ? const Center(child: CircularProgressIndicator())
             : ListView(
+                controller: scrollController,
                 padding: const EdgeInsets.all(16.0),
                 children: [
                   const Text(
@@ -161,6 +209,11 @@ class _ViolationPageState extends State<ViolationPage> {
                         location: violation['location'],
                         onDelete: deleteViolation,
                       )),
+                  if (isLoadingMore)
+                    const Padding(
+                      padding: EdgeInsets.all(16.0),
+                      child: Center(child: CircularProgressIndicator()),
+                    ),
                 ],
               ),
       ),